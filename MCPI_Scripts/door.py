@@ -2,6 +2,6 @@ from MCPI_Scripts.move import mc_socket
 
 def check_for_door():
     """Check for a door and interact with it"""
-    mc_socket.send_command("interact")
-    return True
+    reply = mc_socket.send_command("interact")
+    return reply is not None and reply.get("status") == "ok"
 
@@ -0,0 +1,245 @@
+"""Load generator for the MCWebSocket command channel.
+
+Opens N concurrent MinecraftWebSocket clients against a target (the real
+plugin or sim_server.py), replays a weighted command mix for a fixed time and
+prints throughput and round-trip latency percentiles as JSON.
+
+    python -m MCPI_Scripts.loadgen --clients 8 --duration 10 --mix look_left=4,move_forward=2,interact=1
+    python -m MCPI_Scripts.loadgen --sim --output before.json
+    python -m MCPI_Scripts.loadgen --compare before.json after.json
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import datetime
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+from MCPI_Scripts.move import MinecraftWebSocket
+
+DEFAULT_MIX = "look_left=3,look_right=3,move_forward=2,interact=1"
+
+# Parameters sent with each command. Moves and turns alternate direction so long
+# runs keep the player near where it started.
+COMMAND_PARAMS = {
+    "move_forward": lambda i: {"distance": 1 if i % 2 == 0 else -1},
+    "look_left": lambda i: {"degrees": 5},
+    "look_right": lambda i: {"degrees": 5},
+    "look_up": lambda i: {"degrees": 5 if i % 2 == 0 else 0},
+    "look_down": lambda i: {"degrees": 5 if i % 2 == 0 else 0},
+    "center_view": lambda i: {},
+    "chat": lambda i: {"message": f"loadgen {i}"},
+    "interact": lambda i: {},
+}
+
+# Report fields compared by --compare (higher is better for throughput only)
+COMPARED = ["throughput_rps", "latency_ms.p50", "latency_ms.p95", "latency_ms.p99", "latency_ms.max", "error_rate"]
+
+
+def parse_mix(text):
+    """ "look_left=3,move_forward=1" -> {"look_left": 3.0, "move_forward": 1.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in COMMAND_PARAMS:
+            raise ValueError(f"Unknown command in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies):
+    """Latency stats in milliseconds for a list of seconds."""
+    values = sorted(latency * 1000 for latency in latencies)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(values[-1], 3),
+    }
+
+
+class LoadClient:
+    """One connection replaying the mix, keeping up to `inflight` commands outstanding."""
+
+    def __init__(self, url, mix, inflight, seed, timeout):
+        self.socket = MinecraftWebSocket(url, timeout=timeout)
+        self.commands = list(mix)
+        self.weights = [mix[name] for name in self.commands]
+        self.inflight = inflight
+        self.random = random.Random(seed)
+        self.timeout = timeout
+        self.samples = []  # (command, latency seconds)
+        self.errors = 0  # replies with an error status
+        self.failures = 0  # no reply at all (timeout or lost connection)
+
+    def submit(self, i):
+        command = self.random.choices(self.commands, self.weights)[0]
+        sent = time.perf_counter()
+        future = self.socket.submit_command(command, COMMAND_PARAMS[command](i))
+        # Stamp completion in the reader thread, not when this thread gets around to it
+        future.add_done_callback(lambda f: setattr(f, "completed", time.perf_counter()))
+        return command, sent, future
+
+    def collect(self, entry):
+        command, sent, future = entry
+        try:
+            reply = future.result(self.timeout)
+        except Exception:
+            self.failures += 1
+            return
+        if reply.get("status") != "ok":
+            self.errors += 1
+        self.samples.append((command, getattr(future, "completed", time.perf_counter()) - sent))
+
+    def run(self, deadline):
+        outstanding = deque()
+        i = 0
+        while time.perf_counter() < deadline:
+            while len(outstanding) < self.inflight:
+                outstanding.append(self.submit(i))
+                i += 1
+            self.collect(outstanding.popleft())
+        while outstanding:
+            self.collect(outstanding.popleft())
+        self.socket.close()
+
+
+def run_load(url, clients=4, duration=10.0, mix=None, inflight=1, warmup=1.0, timeout=5.0, seed=0):
+    """Run the load and return the report dict."""
+    mix = mix or parse_mix(DEFAULT_MIX)
+    workers = [LoadClient(url, mix, inflight, seed + n, timeout) for n in range(clients)]
+    # Connect (and let the server see every client) before timing starts
+    for worker in workers:
+        worker.socket.connect()
+    if warmup > 0:
+        warm_deadline = time.perf_counter() + warmup
+        threads = [threading.Thread(target=worker.run, args=(warm_deadline,)) for worker in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for worker in workers:
+            worker.samples, worker.errors, worker.failures = [], 0, 0
+            worker.socket.connect()
+
+    started_at = datetime.datetime.now().isoformat()
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [threading.Thread(target=worker.run, args=(deadline,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for worker in workers for sample in worker.samples]
+    failures = sum(worker.failures for worker in workers)
+    errors = sum(worker.errors for worker in workers) + failures
+    requests = len(samples) + failures
+    per_command = {}
+    for name in mix:
+        per_command[name] = summarize([latency for command, latency in samples if command == name])
+    return {
+        "target": url,
+        "started_at": started_at,
+        "clients": clients,
+        "inflight": inflight,
+        "mix": mix,
+        "duration_s": round(elapsed, 3),
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / max(1, requests), 5),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "latency_ms": summarize([latency for _, latency in samples]),
+        "per_command": per_command,
+    }
+
+
+def lookup(report, dotted):
+    value = report
+    for key in dotted.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def compare(base, new):
+    """Per-metric change from base to new (absolute and percent)."""
+    changes = {}
+    for metric in COMPARED:
+        before, after = lookup(base, metric), lookup(new, metric)
+        if before is None or after is None:
+            continue
+        changes[metric] = {
+            "base": before,
+            "new": after,
+            "delta": round(after - before, 3),
+            "change_pct": round((after - before) / before * 100, 1) if before else None,
+        }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Command-channel load test for MCWebSocket")
+    parser.add_argument("--url", default="ws://localhost:8765")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted commands, e.g. look_left=3,interact=1")
+    parser.add_argument("--inflight", type=int, default=1, help="Commands each client keeps outstanding")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default=None, help="Free-form label stored in the report (e.g. a git revision)")
+    parser.add_argument("--sim", action="store_true", help="Start sim_server.py in-process and load it")
+    parser.add_argument("--sim-tick", type=float, default=0.05, help="Tick length of the --sim server")
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Diff two saved reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        json.dump(compare(base, new), sys.stdout, indent=2)
+        print()
+        return
+
+    server = None
+    url = args.url
+    if args.sim:
+        from MCPI_Scripts.sim_server import SimServer
+        server = SimServer(port=urlparse(url).port or 8765, tick=args.sim_tick)
+        server.run_in_thread()
+
+    report = run_load(url, clients=args.clients, duration=args.duration, mix=parse_mix(args.mix),
+                      inflight=args.inflight, warmup=args.warmup, timeout=args.timeout, seed=args.seed)
+    if args.label:
+        report["label"] = args.label
+    if server is not None:
+        server.shutdown()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,247 @@
 import websocket
 import json
-import time
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Future
 
 class MinecraftWebSocket:
-    def __init__(self):
+    """Client for the MCWebSocket plugin.
+
+    Every command is tagged with an "id" that the plugin echoes back, and a reader
+    thread resolves the matching Future, so many commands can be in flight at once
+    and stray server messages (like the greeting) are never paired with a command.
+    The plugin only replies once a command has run, with the resulting player pose,
+    so a resolved reply means the world has changed.
+    """
+
+    def __init__(self, url="ws://localhost:8765", timeout=5.0):
+        # Connect lazily on the first command so importing this module never opens a socket
+        self.url = url
+        self.timeout = timeout
         self.ws = None
-        self.connect()
+        self.pending = {}  # request id -> (socket, Future)
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.ids = itertools.count(1)
+        # Player pose ({x, y, z, yaw, pitch}) from the most recent acknowledgement
+        self.last_pose = None
 
     def connect(self):
         try:
-            self.ws = websocket.WebSocket()
-            self.ws.connect("ws://localhost:8765")
+            ws = websocket.WebSocket()
+            ws.connect(self.url)
         except Exception as e:
             print(f"Failed to connect to Minecraft server: {e}")
             self.ws = None
-
-    def send_command(self, command, params=None):
-        if self.ws is None:
-            print("Not connected to Minecraft server")
             return
+        self.ws = ws
+        reader = threading.Thread(target=self._read_loop, args=(ws,), daemon=True)
+        reader.start()
+
+    def _read_loop(self, ws):
+        """Resolve pending commands by id until the connection drops."""
+        while True:
+            try:
+                message = ws.recv()
+            except Exception:
+                break
+            if not message:
+                break
+            try:
+                reply = json.loads(message)
+            except ValueError:
+                # Plain-text server messages such as the connection greeting
+                print(f"Minecraft server: {message}")
+                continue
+            if not isinstance(reply, dict) or reply.get("id") is None:
+                print(f"Minecraft server: {message}")
+                continue
+            if reply.get("pose"):
+                self.last_pose = reply["pose"]
+            with self.lock:
+                entry = self.pending.pop(reply["id"], None)
+            if entry and not entry[1].done():
+                entry[1].set_result(reply)
+        self._fail_pending(ws, ConnectionError("Connection to Minecraft server lost"))
 
-        message = {
+    def _fail_pending(self, ws, error):
+        """Fail every command still waiting on this socket."""
+        with self.lock:
+            if self.ws is ws:
+                self.ws = None
+            failed = [rid for rid, (sock, _) in self.pending.items() if sock is ws]
+            futures = [self.pending.pop(rid)[1] for rid in failed]
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _submit(self, message):
+        """Tag a message with a fresh request id and send it. Returns a Future for the reply."""
+        future = Future()
+        # Under the lock so two threads (e.g. the Tk thread and an autonomous run)
+        # cannot both connect and leak one socket and its reader
+        with self.lock:
+            if self.ws is None:
+                self.connect()
+            ws = self.ws
+        if ws is None:
+            future.set_exception(ConnectionError("Not connected to Minecraft server"))
+            return future
+
+        with self.lock:
+            request_id = next(self.ids)
+            self.pending[request_id] = (ws, future)
+        future.request_id = request_id
+        message = dict(message, id=request_id)
+
+        try:
+            with self.send_lock:
+                ws.send(json.dumps(message))
+        except Exception as e:
+            with self.lock:
+                self.pending.pop(request_id, None)
+            future.set_exception(e)
+            # Drop the socket so the next command reconnects
+            self._fail_pending(ws, e)
+            try:
+                ws.close()
+            except Exception:
+                pass
+        return future
+
+    def _discard(self, *futures):
+        """Forget commands whose caller stopped waiting (timeout or cancellation)."""
+        with self.lock:
+            for future in futures:
+                self.pending.pop(getattr(future, "request_id", None), None)
+
+    def submit_command(self, command, params=None):
+        """Send a command without waiting. Returns a Future resolving to the reply dict."""
+        return self._submit({
             "command": command,
             "params": params or {}
-        }
-        
+        })
+
+    def submit_batch(self, actions):
+        """Send an ordered list of (command, params) pairs as one frame. Returns a Future for the reply."""
+        return self._submit({
+            "batch": [{"command": command, "params": params or {}} for command, params in actions]
+        })
+
+    def send_command(self, command, params=None, timeout=None):
+        """Send a command and block until its reply arrives. Returns the reply dict or None on error."""
+        future = self.submit_command(command, params)
         try:
-            self.ws.send(json.dumps(message))
-            response = self.ws.recv()
-            return response
+            return future.result(timeout or self.timeout)
         except Exception as e:
+            self._discard(future)
             print(f"Error sending command: {e}")
-            self.connect()  # Try to reconnect
             return None
 
+    def send_commands(self, commands, timeout=None):
+        """Pipeline a list of (command, params) pairs and wait for all replies.
+
+        All commands are sent before any reply is awaited, so the sequence costs about
+        one round trip. The plugin runs them in order. Returns replies in the same order.
+        """
+        futures = [self.submit_command(command, params) for command, params in commands]
+        replies = []
+        for future in futures:
+            try:
+                replies.append(future.result(timeout or self.timeout))
+            except Exception as e:
+                self._discard(future)
+                print(f"Error sending command: {e}")
+                replies.append(None)
+        return replies
+
+    def send_batch(self, actions, timeout=None):
+        """Run an ordered list of (command, params) pairs in one frame and one server tick.
+
+        Returns the per-action results reported by the plugin, or None on error.
+        """
+        future = self.submit_batch(actions)
+        try:
+            reply = future.result(timeout or self.timeout)
+        except Exception as e:
+            self._discard(future)
+            print(f"Error sending batch: {e}")
+            return None
+        return reply.get("results")
+
+    async def send_command_async(self, command, params=None, timeout=None):
+        """asyncio version of send_command. Raises on error or timeout."""
+        future = self.submit_command(command, params)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except BaseException:
+            self._discard(future)
+            raise
+
+    async def send_batch_async(self, actions, timeout=None):
+        """asyncio version of send_batch. Raises on error or timeout."""
+        future = self.submit_batch(actions)
+        try:
+            reply = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except BaseException:
+            self._discard(future)
+            raise
+        return reply.get("results")
+
+    async def send_commands_async(self, commands, timeout=None):
+        """asyncio version of send_commands. Failed commands come back as exceptions."""
+        futures = [self.submit_command(command, params) for command, params in commands]
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True),
+                timeout or self.timeout
+            )
+        except BaseException:
+            self._discard(*futures)
+            raise
+
     def close(self):
-        if self.ws:
-            self.ws.close()
+        ws = self.ws
+        if ws:
+            ws.close()
+            self._fail_pending(ws, ConnectionError("Connection closed"))
+            self.ws = None
 
 # Create a global instance
 mc_socket = MinecraftWebSocket()
 
+def send_batch(actions):
+    """Runs an ordered list of (command, params) pairs in one frame and one server tick."""
+    return mc_socket.send_batch(actions)
+
 def move_forward(distance):
-    """Moves the player forward by the specified distance."""
-    mc_socket.send_command("move_forward", {"distance": distance})
-    time.sleep(0.2)
+    """Moves the player forward by the specified distance.
+
+    Returns once the server has applied the move; the reply carries the resulting pose.
+    """
+    return mc_socket.send_command("move_forward", {"distance": distance})
 
 def look_left(degrees):
     """Rotates the player's view to the left by the specified degrees."""
-    mc_socket.send_command("look_left", {"degrees": degrees})
+    return mc_socket.send_command("look_left", {"degrees": degrees})
 
 def look_right(degrees):
     """Rotates the player's view to the right by the specified degrees."""
-    mc_socket.send_command("look_right", {"degrees": degrees})
+    return mc_socket.send_command("look_right", {"degrees": degrees})
 
 def look_up(degrees):
     """Changes the player's pitch upwards."""
-    mc_socket.send_command("look_up", {"degrees": degrees})
+    return mc_socket.send_command("look_up", {"degrees": degrees})
 
 def look_down(degrees):
     """Changes the player's pitch downwards."""
-    mc_socket.send_command("look_down", {"degrees": degrees})
+    return mc_socket.send_command("look_down", {"degrees": degrees})
 
 def center_view():
     """Centers the player's view."""
-    mc_socket.send_command("center_view")
+    return mc_socket.send_command("center_view")
 
 def post_to_chat(msg):
     """Posts a message to the Minecraft chat."""
-    mc_socket.send_command("chat", {"message": msg})
\ No newline at end of file
+    return mc_socket.send_command("chat", {"message": msg})
\ No newline at end of file
@@ -0,0 +1,298 @@
+"""Pure-Python stand-in for the MCWebSocket Bukkit plugin.
+
+Speaks the same JSON protocol on ws://localhost:8765:
+  {"id": 1, "command": "look_left", "params": {"degrees": 30}}
+  {"id": 2, "batch": [{"command": ..., "params": ...}, ...]}
+and replies once the command has run, with the resulting player pose. Commands
+from every connection run in arrival order on one simulated server tick, like
+Bukkit's main thread. The world is a small block grid with a wall and a door in
+front of the spawn point.
+
+    python -m MCPI_Scripts.sim_server --latency 0.02 --tick 0.05
+"""
+import json
+import math
+import random
+import asyncio
+import argparse
+import threading
+
+import websockets
+
+# Eye height above the player's feet, used for interact's line of sight
+EYE_HEIGHT = 1.62
+# Reach of interact (player.getTargetBlock(null, 5))
+REACH = 5
+GREETING = "Connected to Minecraft server"
+
+
+class SimWorld:
+    """Player pose, block grid and chat log of the simulated server."""
+
+    def __init__(self):
+        self.pose = {"x": 0.5, "y": 64.0, "z": 0.5, "yaw": 0.0, "pitch": 0.0}
+        self.blocks = {}  # (x, y, z) -> block name
+        self.doors = {}  # (x, y, z) -> open?
+        self.chat = []
+        # Floor, and a stone wall with a door 3 blocks ahead of spawn (+z is yaw 0)
+        for x in range(-8, 9):
+            for z in range(-8, 9):
+                self.blocks[(x, 63, z)] = "grass_block"
+        for x in range(-3, 4):
+            for y in (64, 65):
+                self.blocks[(x, y, 3)] = "stone"
+        for y in (64, 65):
+            self.blocks[(0, y, 3)] = "oak_door"
+            self.doors[(0, y, 3)] = False
+
+    def pose_copy(self):
+        return dict(self.pose)
+
+    @staticmethod
+    def wrap_yaw(yaw):
+        return (yaw + 180.0) % 360.0 - 180.0
+
+    def target_block(self):
+        """First solid block along the line of sight within REACH, or None."""
+        yaw, pitch = math.radians(self.pose["yaw"]), math.radians(self.pose["pitch"])
+        dx = -math.sin(yaw) * math.cos(pitch)
+        dy = -math.sin(pitch)
+        dz = math.cos(yaw) * math.cos(pitch)
+        x, y, z = self.pose["x"], self.pose["y"] + EYE_HEIGHT, self.pose["z"]
+        steps = REACH * 20
+        for i in range(1, steps + 1):
+            t = i / 20
+            block = (math.floor(x + dx * t), math.floor(y + dy * t), math.floor(z + dz * t))
+            # Only air is see-through, so an open door is still the target
+            if block in self.blocks:
+                return block
+        return None
+
+    def handle_command(self, command, params):
+        """Apply one command. Returns False for an unknown command, raises on bad params."""
+        params = params or {}
+        pose = self.pose
+        if command == "move_forward":
+            distance = float(params["distance"])
+            rad = math.radians(pose["yaw"])
+            pose["x"] += -math.sin(rad) * distance
+            pose["z"] += math.cos(rad) * distance
+        elif command == "look_left":
+            pose["yaw"] = self.wrap_yaw(pose["yaw"] - float(params["degrees"]))
+        elif command == "look_right":
+            pose["yaw"] = self.wrap_yaw(pose["yaw"] + float(params["degrees"]))
+        elif command == "look_up":
+            pose["pitch"] = max(-90.0, pose["pitch"] - float(params["degrees"]))
+        elif command == "look_down":
+            pose["pitch"] = min(90.0, pose["pitch"] + float(params["degrees"]))
+        elif command == "center_view":
+            pose["yaw"] = 0.0
+            pose["pitch"] = 0.0
+        elif command == "chat":
+            self.chat.append(str(params["message"]))
+        elif command == "interact":
+            block = self.target_block()
+            if block in self.doors:
+                # Both halves of the door open together
+                is_open = not self.doors[block]
+                for y in (block[1] - 1, block[1], block[1] + 1):
+                    if (block[0], y, block[2]) in self.doors:
+                        self.doors[(block[0], y, block[2])] = is_open
+        else:
+            return False
+        return True
+
+    def run_command(self, command, params):
+        """Run one command and report its outcome, like the plugin's runCommand."""
+        result = {"command": command}
+        try:
+            if self.handle_command(command, params):
+                result["status"] = "ok"
+            else:
+                result["status"] = "error"
+                result["error"] = f"Unknown command: {command}"
+        except (KeyError, TypeError, ValueError) as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+        result["pose"] = self.pose_copy()
+        return result
+
+
+class SimServer:
+    """asyncio WebSocket server running SimWorld commands on a simulated tick.
+
+    tick: seconds between server ticks (0.05 is Minecraft's 20 TPS; 0 runs
+        commands as soon as they arrive). Every task queued before a tick runs in it.
+    latency: extra seconds before each reply is sent, either a number or a dict
+        of per-command values with an optional "default".
+    jitter: up to this many extra seconds, chosen at random per reply.
+    """
+
+    def __init__(self, host="localhost", port=8765, tick=0.05, latency=0.0, jitter=0.0, world=None):
+        self.host = host
+        self.port = port
+        self.tick = tick
+        self.latency = latency
+        self.jitter = jitter
+        self.world = world or SimWorld()
+        self.tasks = None
+        self.server = None
+        self.loop = None
+        self.ticker = None
+        self.commands_run = 0
+
+    def latency_for(self, command):
+        if isinstance(self.latency, dict):
+            return self.latency.get(command, self.latency.get("default", 0.0))
+        return self.latency
+
+    async def reply_later(self, websocket, reply, delay):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await websocket.send(json.dumps(reply))
+        except websockets.ConnectionClosed:
+            pass  # The client may have gone away while the task was queued
+
+    def run_task(self, websocket, message):
+        """Body of the plugin's runTask for one message (runs on the tick)."""
+        message_id = message.get("id")
+        batch = message.get("batch")
+        if batch is not None:
+            results = [self.world.run_command(action.get("command"), action.get("params")) for action in batch]
+            reply = {"id": message_id, "status": "ok", "command": "batch",
+                     "results": results, "pose": self.world.pose_copy()}
+            commands = [action.get("command") for action in batch]
+        else:
+            reply = self.world.run_command(message.get("command"), message.get("params"))
+            reply["id"] = message_id
+            commands = [message.get("command")]
+        self.commands_run += len(commands)
+        delay = max(self.latency_for(command) for command in commands) if commands else 0.0
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        asyncio.ensure_future(self.reply_later(websocket, reply, delay))
+
+    async def tick_loop(self):
+        """The simulated main thread: run every queued task once per tick, in order."""
+        while True:
+            if self.tick > 0:
+                await asyncio.sleep(self.tick)
+            else:
+                self.run_task(*await self.tasks.get())
+            while not self.tasks.empty():
+                self.run_task(*self.tasks.get_nowait())
+
+    async def handler(self, websocket):
+        print(f"New connection from {websocket.remote_address}")
+        await websocket.send(GREETING)
+        try:
+            async for raw in websocket:
+                # Errors echo the request id too, unless the frame had no readable id
+                message_id = None
+                try:
+                    message = json.loads(raw)
+                    if not isinstance(message, dict):
+                        raise ValueError("not an object")
+                    message_id = message.get("id")
+                    batch = message.get("batch")
+                    if batch is not None and not (isinstance(batch, list)
+                                                  and all(isinstance(action, dict) for action in batch)):
+                        raise ValueError("batch is not a list of actions")
+                except ValueError as e:
+                    print(f"Failed to parse message: {e}")
+                    await websocket.send(json.dumps({"id": message_id, "status": "error", "command": None,
+                                                     "error": "Invalid command format"}))
+                    continue
+                self.tasks.put_nowait((websocket, message))
+        except websockets.ConnectionClosed:
+            pass
+        print(f"Connection closed: {websocket.remote_address}")
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.tasks = asyncio.Queue()
+        self.ticker = asyncio.ensure_future(self.tick_loop())
+        self.server = await websockets.serve(self.handler, self.host, self.port)
+        print(f"WebSocket server started on port {self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        await self.server.wait_closed()
+
+    async def stop(self):
+        self.ticker.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+
+    def run_in_thread(self):
+        """Start the server on a background event loop (for tests and load runs).
+
+        Returns once listening; re-raises the error if the server could not start
+        (e.g. the port is already in use).
+        """
+        started = threading.Event()
+        failure = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as e:
+                failure.append(e)
+                if self.ticker is not None:
+                    self.ticker.cancel()
+                    loop.run_until_complete(asyncio.gather(self.ticker, return_exceptions=True))
+                loop.close()
+                return
+            finally:
+                started.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        started.wait()
+        if failure:
+            raise failure[0]
+        return thread
+
+    def shutdown(self):
+        """Stop a server started with run_in_thread."""
+        future = asyncio.run_coroutine_threadsafe(self.stop(), self.loop)
+        future.result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def parse_latency(values, default):
+    """--command-latency interact=0.05 ... into a latency dict (or the plain default)."""
+    if not values:
+        return default
+    latency = {"default": default}
+    for value in values:
+        command, _, seconds = value.partition("=")
+        latency[command] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated MCWebSocket server (no Minecraft needed)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick", type=float, default=0.05, help="Seconds per server tick (0 for none)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Extra seconds before every reply")
+    parser.add_argument("--command-latency", action="append", metavar="COMMAND=SECONDS",
+                        help="Per-command reply latency, e.g. interact=0.05 (repeatable)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra reply latency, up to this many seconds")
+    args = parser.parse_args()
+
+    server = SimServer(args.host, args.port, tick=args.tick,
+                       latency=parse_latency(args.command_latency, args.latency), jitter=args.jitter)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
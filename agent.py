@@ -0,0 +1,668 @@
+import os
+import time
+import json
+import uuid
+import datetime
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Import OpenRouter/OpenAI client ---
+from openai import APIError
+# --- Shared pooled client with retries ---
+from llm_client import get_llm_client, HedgePolicy
+
+# --- Screenshot encoding (with cache) ---
+from image_encoding import EncodingPolicy, default_cache, estimate_image_tokens
+# --- Response cache for replays ---
+from llm_cache import ResponseCache, request_key
+# --- Bounded context ---
+from history import HistoryManager
+# --- Skip frames with no visible change ---
+from frame_diff import FrameDiffer, NO_CHANGE_NOTE
+
+# --- Import move.py ---
+import MCPI_Scripts.move as move
+# --- Tool definitions and dispatch for the actions in move.py and door.py ---
+from tools import ToolError, default_registry
+
+SYSTEM_PROMPT = """You are a Minecraft assistant. When you want to execute an action,
+    output it in the following format (only one command at a time):
+    <<COMMAND>>
+    action_name(parameter)
+    <<END>>
+
+    Available commands:
+    - move_forward(distance)
+    - look_left(degrees)
+    - look_right(degrees)
+    - look_up(degrees)
+    - look_down(degrees)
+    - open_door()
+
+    Important:
+    - Only issue one command at a time. Wait for feedback before issuing another command.
+    - When making degree adjustments, always compare the current viewpoint's centered position to the target's position.
+    - Always reassess the current view position when a new screenshot is provided, as it indicates a change in perspective, as the degrees on the axis are relative to the new screenshot.
+
+    Always provide a reason for the action, then output the command in the specified format.
+    Example:
+    I'll move forward 10 blocks to reach the house.
+    <<COMMAND>>
+    move_forward(10)
+    <<END>>
+
+    When the goal has been achieved, explain why and output <<DONE>> instead of a command.
+    """
+
+# System prompt used with native tool calling instead of the <<COMMAND>> text format
+TOOLS_SYSTEM_PROMPT = """You are a Minecraft assistant. Control the player by calling the provided tools.
+    You may call several tools in one response; they run in order, then you get a new screenshot.
+
+    Important:
+    - When making degree adjustments, always compare the current viewpoint's centered position to the target's position.
+    - Always reassess the current view position when a new screenshot is provided, as it indicates a change in perspective, as the degrees on the axis are relative to the new screenshot.
+
+    Keep your explanation short. When the goal has been achieved, explain why and output <<DONE>> instead of calling a tool.
+    """
+
+# Follow-up text sent with every screenshot after the first turn of an episode
+FOLLOW_UP_PROMPT = "Command executed. Here is the updated view."
+
+
+def extract_command(command_str):
+    """Return the text between <<COMMAND>> and <<END>>, or None if there is no command block."""
+    if not command_str or "<<COMMAND>>" not in command_str or "<<END>>" not in command_str:
+        return None
+    return command_str.split("<<COMMAND>>")[1].split("<<END>>")[0].strip()
+
+
+def is_done(response):
+    """Return True if the model declared the goal complete."""
+    return bool(response) and "<<DONE>>" in response
+
+
+class CommandStreamParser:
+    """Finds the first complete <<COMMAND>>...<<END>> block in streamed text.
+
+    Only the unscanned tail of the buffer is searched on each feed, so cost stays
+    linear in the length of the response.
+    """
+
+    START = "<<COMMAND>>"
+    END = "<<END>>"
+
+    def __init__(self):
+        self.buffer = ""
+        self.scan_from = 0
+        self.start = -1
+        self.command = None
+
+    def feed(self, text):
+        """Add streamed text. Returns the command block the first time it is complete, else None."""
+        self.buffer += text
+        if self.command is not None:
+            return None
+        if self.start < 0:
+            self.start = self.buffer.find(self.START, self.scan_from)
+            if self.start < 0:
+                # A marker may be split across chunks, so rescan its possible prefix next time
+                self.scan_from = max(0, len(self.buffer) - len(self.START) + 1)
+                return None
+            self.scan_from = self.start + len(self.START)
+        end = self.buffer.find(self.END, self.scan_from)
+        if end < 0:
+            self.scan_from = max(self.start + len(self.START), len(self.buffer) - len(self.END) + 1)
+            return None
+        self.command = self.buffer[self.start:end + len(self.END)]
+        return self.command
+
+
+def execute_command(command_str, registry=None):
+    """Execute a command from the LLM through the tool registry."""
+    registry = registry or default_registry
+    # Extract command between markers
+    command = extract_command(command_str)
+    if command is None:
+        return False
+    try:
+        name, arguments = registry.parse_text_command(command)
+    except ToolError as e:
+        print(f"Error executing command: {e}")
+        return False
+    # Each call returns once the server has applied it
+    result = registry.dispatch(name, arguments)
+    if not result["ok"]:
+        print(f"Error executing command: {result['error']}")
+    return result["ok"]
+
+
+def describe_tool_calls(tool_calls):
+    """One-line summary of tool calls, e.g. "look_left(degrees=30); move_forward(distance=2)"."""
+    calls = []
+    for call in tool_calls:
+        try:
+            arguments = json.loads(call["function"]["arguments"] or "{}")
+            args = ", ".join(f"{key}={value}" for key, value in arguments.items())
+        except (ValueError, AttributeError):
+            args = call["function"]["arguments"]
+        calls.append(f"{call['function']['name']}({args})")
+    return "; ".join(calls)
+
+
+class AgentEngine:
+    """GUI-free agent loop: message history, model calls, command execution and screenshot attach."""
+
+    SYSTEM_PROMPT = SYSTEM_PROMPT
+
+    def __init__(self, api_key, model, window_capture=None, window_title=None, base_url=None,
+                 encoding_cache=None, encoding_policy=None, history=None, stream=False,
+                 use_tools=False, registry=None, response_cache=None, frame_differ=None, hedge=None):
+        self.api_key = api_key
+        self.model_name = model
+        # One pooled keep-alive client per key/endpoint, shared by every engine
+        self.llm = get_llm_client(self.api_key, base_url or os.environ.get("OPENROUTER_BASE_URL"))
+        self.client = self.llm.openai
+        # Timing of the last model request (see llm_client.LLMClient.create)
+        self.last_timing = None
+        # Optional HedgePolicy: re-send requests whose first token is slow
+        self.hedge = hedge
+        # Capture source is optional so episodes can run without a window (text-only)
+        self.window_capture = window_capture
+        self.window_title = window_title
+        self.screenshot_image = None
+        # How long to wait for a continuous-capture frame newer than the last action
+        self.frame_timeout = 1.0
+        # Re-sending an unchanged screenshot reuses its encoded payload
+        self.encoding_cache = encoding_cache or default_cache
+        # Resize/format policy for uploaded screenshots
+        self.encoding_policy = encoding_policy or EncodingPolicy()
+        # Evicts old screenshots and trims the context before every model call
+        self.history = history or HistoryManager()
+        # Stream completions and run the command as soon as its block is complete
+        self.stream = stream
+        # Native tool calling instead of parsing <<COMMAND>> blocks
+        self.use_tools = use_tools
+        self.registry = registry or default_registry
+        self.tool_calls = []
+        # Optional on-disk cache for deterministic replays (see llm_cache.py)
+        self.response_cache = response_cache
+        # Optional FrameDiffer: frames with no visible change are replaced by a short note
+        self.frame_differ = frame_differ
+        self.command_pool = ThreadPoolExecutor(max_workers=1)
+        self.dispatched = None
+        self.last_error = None
+        # Set to stop a running autonomous episode after the current turn
+        self.stop_event = threading.Event()
+        self.reset()
+
+    def reset(self):
+        """Reset the conversation to only contain the system prompt."""
+        self.messages = [{
+            "role": "system",
+            "content": TOOLS_SYSTEM_PROMPT if self.use_tools else self.SYSTEM_PROMPT
+        }]
+        self.screenshot_image = None
+        self.last_action = None
+        self.tool_calls = []
+        self.history.reset()
+        if self.frame_differ is not None:
+            self.frame_differ.reset()
+
+    def capture_screenshot(self, since=None):
+        """Capture the configured window and keep it as the image for the next message.
+
+        With continuous capture running, the newest ring-buffer frame captured
+        after `since` (a time.monotonic() value, e.g. the last command ack) is used
+        instead of a fresh capture.
+        """
+        if self.window_capture is None or not self.window_title:
+            return None
+        img = None
+        if getattr(self.window_capture, "continuous", False):
+            _, img = self.window_capture.latest_frame(newer_than=since, timeout=self.frame_timeout)
+            if img is not None:
+                self.window_capture.save_frame(img, self.window_title)
+        if img is None:
+            img = self.window_capture.capture_and_save(self.window_title)
+        if img:
+            self.screenshot_image = img
+        return img
+
+    def build_image_part(self, image):
+        """Encode an image into a content part for a user message."""
+        policy = self.encoding_policy
+        base64_image, _ = self.encoding_cache.encode(image, encoder=policy.encode, variant=policy.variant)
+        return policy.image_part(base64_image)
+
+    def build_message_content(self, text, image=None, image_part=None):
+        """Build the content list for a user message, attaching the image if given."""
+        message_content = [{"type": "text", "text": text}]
+        if image_part is None and image:
+            image_part = self.build_image_part(image)
+        if image_part is not None:
+            message_content.append(image_part)
+        return message_content
+
+    def prepare_frame(self, since=None):
+        """Capture and encode the next observation. Returns (image, image_part), both None without a capture source.
+
+        With a frame differ, a frame that looks the same as the last one sent comes
+        back with a text part saying so instead of an image part.
+        """
+        image = self.capture_screenshot(since)
+        if image is None:
+            return None, None
+        if self.frame_differ is not None and not self.frame_differ.changed(image):
+            return image, {"type": "text", "text": NO_CHANGE_NOTE}
+        return image, self.build_image_part(image)
+
+    def completion_params(self):
+        """Model and sampling parameters used for every request."""
+        params = {
+            "model": self.model_name,
+            "max_tokens": 1024,
+            "temperature": 0.7,
+            "top_p": 1,
+            "seed": 12345,
+            "user": "my-test-user",
+        }
+        if self.use_tools:
+            params["tools"] = self.registry.definitions
+        return params
+
+    def chat_with_model(self, messages):
+        """Send the messages to the model. Returns the response text, or None on error (see last_error)."""
+        if self.hedge is not None:
+            # Hedging watches for the first token, so it always streams underneath
+            return self.chat_with_model_stream(messages)
+        self.last_error = None
+        self.last_timing = None
+        self.tool_calls = []
+        try:
+            # Add debug logging
+            print(f"Sending message to {self.model_name}")
+            print(f"Number of messages in context: {len(messages)}")
+            print(f"Latest message type: {type(messages[-1]['content'])}")
+
+            chat_completion, self.last_timing = self.llm.create(
+                messages=messages,
+                **self.completion_params()
+            )
+
+            if not chat_completion or not chat_completion.choices:
+                print("Debug: Received empty response from API")
+                print(f"Full API response: {chat_completion}")
+                raise Exception("No response received from the API")
+
+            message = chat_completion.choices[0].message
+            self.tool_calls = [{
+                "id": call.id,
+                "type": "function",
+                "function": {"name": call.function.name, "arguments": call.function.arguments}
+            } for call in message.tool_calls or []]
+            response = message.content
+            if response is None and self.tool_calls:
+                response = ""
+            return response
+        except APIError as e:
+            print(f"API Error details: {str(e)}")
+            self.last_error = e
+            return None
+        except Exception as e:
+            print(f"Unexpected error details: {str(e)}")
+            print(f"Last message content: {messages[-1]['content'] if messages else 'No messages'}")
+            self.last_error = e
+            return None
+
+    def chat_with_model_stream(self, messages, on_token=None, on_command=None):
+        """Streaming version of chat_with_model.
+
+        on_token(text) is called for every content delta. on_command(block) is called
+        as soon as the first <<COMMAND>>...<<END>> block is complete, while the rest
+        of the response is still streaming. Returns the full text, or None on error.
+        """
+        self.last_error = None
+        self.last_timing = None
+        self.tool_calls = []
+        try:
+            print(f"Streaming message to {self.model_name}")
+            print(f"Number of messages in context: {len(messages)}")
+
+            started = time.perf_counter()
+            if self.hedge is not None:
+                stream, self.last_timing = self.llm.create_hedged(
+                    self.hedge,
+                    messages=messages,
+                    **self.completion_params()
+                )
+                if self.last_timing["hedge"]["fired"]:
+                    print(f"Hedged request won by {self.last_timing['hedge']['winner']} ({self.last_timing['model']})")
+            else:
+                stream, self.last_timing = self.llm.create(
+                    messages=messages,
+                    stream=True,
+                    **self.completion_params()
+                )
+            parser = CommandStreamParser()
+            calls = {}  # tool call index -> call assembled from deltas
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                for call in delta.tool_calls or []:
+                    entry = calls.setdefault(call.index, {
+                        "id": None,
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""}
+                    })
+                    if call.id:
+                        entry["id"] = call.id
+                    if call.function and call.function.name:
+                        entry["function"]["name"] += call.function.name
+                    if call.function and call.function.arguments:
+                        entry["function"]["arguments"] += call.function.arguments
+                text = delta.content
+                if not text:
+                    continue
+                if "ttft_s" not in self.last_timing:
+                    self.last_timing["ttft_s"] = round(time.perf_counter() - started, 3)
+                if on_token:
+                    on_token(text)
+                command = parser.feed(text)
+                if command is not None and on_command:
+                    on_command(command)
+
+            self.tool_calls = [calls[index] for index in sorted(calls)]
+            self.last_timing["total_s"] = round(time.perf_counter() - started, 3)
+            if not parser.buffer and not self.tool_calls:
+                raise Exception("No response received from the API")
+            return parser.buffer
+        except APIError as e:
+            print(f"API Error details: {str(e)}")
+            self.last_error = e
+            return None
+        except Exception as e:
+            print(f"Unexpected error details: {str(e)}")
+            self.last_error = e
+            return None
+
+    def complete(self, messages, on_token=None):
+        """Get the model's reply, going through the response cache when one is configured."""
+        cache = self.response_cache
+        key = None
+        if cache is not None and cache.enabled:
+            key = request_key(self.completion_params(), messages)
+            cached = cache.get(key)
+            if cached is not None:
+                print(f"Response cache hit ({key[:12]})")
+                self.last_error = None
+                self.last_timing = None
+                self.tool_calls = cached["tool_calls"]
+                response = cached["content"]
+                # Behave like a stream that arrived instantly
+                if self.stream and response:
+                    if on_token:
+                        on_token(response)
+                    command = CommandStreamParser().feed(response)
+                    if command is not None:
+                        self.dispatch_command(command)
+                return response
+            if cache.mode == "replay":
+                self.tool_calls = []
+                self.last_error = Exception(f"Response cache miss in replay mode ({key[:12]})")
+                print(self.last_error)
+                return None
+
+        if self.stream:
+            response = self.chat_with_model_stream(messages, on_token=on_token,
+                                                   on_command=self.dispatch_command)
+        else:
+            response = self.chat_with_model(messages)
+        if key is not None and response is not None:
+            cache.put(key, {"content": response, "tool_calls": self.tool_calls})
+        return response
+
+    def dispatch_command(self, command_block):
+        """Start executing a command block in the background; handle_response collects the result."""
+        self.last_action = extract_command(command_block)
+        self.dispatched = self.command_pool.submit(execute_command, command_block)
+
+    def describe_frame(self):
+        """Short text that replaces a screenshot once it is evicted from the history."""
+        pose = move.mc_socket.last_pose
+        if pose:
+            view = f"yaw={pose['yaw']:.1f}, pitch={pose['pitch']:.1f}"
+        else:
+            view = "pose unknown"
+        return f"{view}, action={self.last_action or 'none'} (screenshot removed)"
+
+    def send(self, message_content, image=None, on_token=None):
+        """Append a user message, query the model and record its reply. Returns the reply or None.
+
+        When streaming, any command is already being executed by the time this returns.
+        """
+        message = {"role": "user", "content": message_content}
+        self.messages.append(message)
+        if any(part.get("type") == "image_url" for part in message_content):
+            tokens = None
+            if image is not None:
+                tokens = estimate_image_tokens(*self.encoding_policy.target_size(*image.size),
+                                               detail=self.encoding_policy.detail or "high")
+            self.history.add_frame(message, self.describe_frame(), tokens)
+        context_bytes, context_tokens = self.history.trim(self.messages)
+        print(f"Context estimate: {context_tokens} tokens, {context_bytes} bytes")
+        self.dispatched = None
+        response = self.complete(self.messages, on_token=on_token)
+        if response or self.tool_calls:
+            assistant_message = {"role": "assistant", "content": response}
+            if self.tool_calls:
+                assistant_message["tool_calls"] = self.tool_calls
+            self.messages.append(assistant_message)
+        return response
+
+    def handle_response(self, response):
+        """Execute any command in the model's response. Returns True if a command ran."""
+        if self.tool_calls:
+            return self.run_tool_calls()
+        if self.dispatched is not None:
+            # Already dispatched while streaming; wait for its acknowledgement
+            dispatched, self.dispatched = self.dispatched, None
+            return dispatched.result()
+        if not response:
+            return False
+        self.last_action = extract_command(response)
+        return execute_command(response)
+
+    def run_tool_calls(self):
+        """Run the pending tool calls in order and record their results. Returns True if all succeeded."""
+        tool_calls, self.tool_calls = self.tool_calls, []
+        self.last_action = describe_tool_calls(tool_calls)
+        all_ok = True
+        for call in tool_calls:
+            result = self.registry.dispatch(call["function"]["name"], call["function"]["arguments"])
+            if not result["ok"]:
+                print(f"Error executing tool call: {result['error']}")
+                all_ok = False
+            self.messages.append({
+                "role": "tool",
+                "tool_call_id": call["id"],
+                "content": json.dumps(result)
+            })
+        return all_ok
+
+    def next_action(self, response):
+        """The action the model asked for in this response, or None."""
+        if self.tool_calls:
+            return describe_tool_calls(self.tool_calls)
+        return extract_command(response)
+
+    def stop(self):
+        """Ask a running episode to stop after the current turn."""
+        self.stop_event.set()
+
+    def run_episode(self, goal, max_turns, on_turn=None):
+        """Run one autonomous episode end to end and return its result record.
+
+        Each turn executes the model's command, then captures and encodes the next
+        frame on a worker thread while the current response is parsed and logged, so
+        a turn costs roughly the model latency. The episode ends when the model outputs
+        <<DONE>>, stops issuing commands, errors, is stopped, or max_turns is reached.
+        on_turn(turn_record, image) is called after every turn.
+        """
+        self.reset()
+        self.stop_event.clear()
+        started = time.time()
+        record = {
+            "episode_id": uuid.uuid4().hex,
+            "goal": goal,
+            "model": self.model_name,
+            "max_turns": max_turns,
+            "started_at": datetime.datetime.now().isoformat(),
+            "turns": [],
+            "stop_reason": "max_turns",
+        }
+
+        text = goal
+        with ThreadPoolExecutor(max_workers=1) as capture_pool:
+            frame_future = capture_pool.submit(self.prepare_frame)
+            for turn in range(1, max_turns + 1):
+                if self.stop_event.is_set():
+                    record["stop_reason"] = "stopped"
+                    break
+                image, image_part = frame_future.result()
+                turn_started = time.time()
+                response = self.send(self.build_message_content(text, image_part=image_part), image)
+                latency = time.time() - turn_started
+                if response is None:
+                    record["stop_reason"] = "error"
+                    record["error"] = str(self.last_error)
+                    break
+
+                done = is_done(response)
+                command = None if done else self.next_action(response)
+                executed = False
+                if command is not None:
+                    # Act first, then start capturing the result while this turn is logged
+                    executed = self.handle_response(response)
+                    frame_future = capture_pool.submit(self.prepare_frame, time.monotonic())
+                elif self.dispatched is not None:
+                    # A streamed command runs as soon as its block is complete, even when the
+                    # same response ends with <<DONE>>; record what was actually dispatched
+                    command = self.last_action
+                    executed = self.handle_response(response)
+
+                turn_record = {
+                    "turn": turn,
+                    "response": response,
+                    "command": command,
+                    "executed": executed,
+                    "pose": move.mc_socket.last_pose if executed else None,
+                    "screenshot": image_part is not None and image_part["type"] == "image_url",
+                    "latency_s": round(latency, 3),
+                    "llm": self.last_timing,
+                }
+                record["turns"].append(turn_record)
+                if on_turn:
+                    on_turn(turn_record, image)
+
+                if done:
+                    record["stop_reason"] = "done"
+                    break
+                if command is None:
+                    # The model has nothing left to do
+                    record["stop_reason"] = "no_command"
+                    break
+                text = FOLLOW_UP_PROMPT
+
+        record["num_turns"] = len(record["turns"])
+        record["finished_at"] = datetime.datetime.now().isoformat()
+        record["duration_s"] = round(time.time() - started, 3)
+        return record
+
+
+def write_result(record, output_path):
+    """Append an episode result record as one JSON line."""
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one headless agent episode.")
+    parser.add_argument("--goal", required=True, help="Goal given to the model as the first message")
+    parser.add_argument("--model", default="openai/chatgpt-4o-latest")
+    parser.add_argument("--max-turns", type=int, default=5)
+    parser.add_argument("--window", default=None, help="Title of the window to capture (omit for text-only episodes)")
+    parser.add_argument("--capture-backend", default=None, choices=["quartz", "x11", "synthetic"],
+                        help="Screen capture backend (defaults to $CAPTURE_BACKEND, then the platform's)")
+    parser.add_argument("--capture-fps", type=float, default=0,
+                        help="Capture continuously at this rate into a ring buffer (0 captures on demand)")
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="Send a 'no visual change' note instead of frames that look the same as the last one")
+    parser.add_argument("--logs-dir", default="./logs")
+    parser.add_argument("--output", default="./logs/episodes.jsonl", help="JSONL file the result record is appended to")
+    parser.add_argument("--api-key", default=None, help="Defaults to OPENROUTER_API_KEY")
+    parser.add_argument("--stream", action="store_true", help="Stream completions and run commands as soon as they are complete")
+    parser.add_argument("--tools", action="store_true", help="Use native tool calling instead of <<COMMAND>> text")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Re-send a request whose first token is slower than usual and take whichever answers first")
+    parser.add_argument("--hedge-percentile", type=float, default=95,
+                        help="Percentile of recent times to first token after which the hedge is sent")
+    parser.add_argument("--hedge-deadline", type=float, default=8.0,
+                        help="Seconds to wait before hedging until enough timings are known")
+    parser.add_argument("--fallback-model", default=None, help="Model the hedge goes to (default: the same model)")
+    parser.add_argument("--cache-mode", default="passthrough", choices=["record", "replay", "passthrough"],
+                        help="Response cache: record new responses, replay recorded ones only, or bypass the cache")
+    parser.add_argument("--cache-dir", default="./llm_cache")
+    parser.add_argument("--image-format", default="JPEG", choices=["JPEG", "WEBP", "PNG"])
+    parser.add_argument("--image-quality", type=int, default=85)
+    parser.add_argument("--max-dimension", type=int, default=None, help="Cap on the longest side of uploaded screenshots")
+    parser.add_argument("--tile-snap", type=float, default=None,
+                        help="Shrink onto the 512px tile grid when it keeps at least this fraction of the size (e.g. 0.8)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    api_key = args.api_key or os.environ.get("OPENROUTER_API_KEY")
+    if not api_key:
+        if args.cache_mode != "replay":
+            parser.error("No API key: pass --api-key or set OPENROUTER_API_KEY")
+        # Replays never reach the API, but the client still wants a key
+        api_key = "replay-only"
+
+    window_capture = None
+    if args.window:
+        # Imported lazily so text-only episodes do not need a capture backend
+        from screenshot import WindowCapture
+        window_capture = WindowCapture(args.logs_dir, backend=args.capture_backend)
+        if args.capture_fps > 0:
+            window_capture.start_continuous(args.window, fps=args.capture_fps)
+
+    response_cache = None
+    if args.cache_mode != "passthrough":
+        response_cache = ResponseCache(args.cache_dir, mode=args.cache_mode)
+
+    policy = EncodingPolicy(format=args.image_format, quality=args.image_quality,
+                            max_dimension=args.max_dimension, tile_snap=args.tile_snap)
+    hedge = None
+    if args.hedge or args.fallback_model:
+        hedge = HedgePolicy(percentile=args.hedge_percentile, default_deadline=args.hedge_deadline,
+                            fallback_model=args.fallback_model)
+    engine = AgentEngine(api_key, args.model, window_capture=window_capture, window_title=args.window,
+                         encoding_policy=policy, stream=args.stream,
+                         use_tools=args.tools, response_cache=response_cache,
+                         frame_differ=FrameDiffer() if args.skip_unchanged else None, hedge=hedge)
+    record = engine.run_episode(args.goal, args.max_turns)
+    write_result(record, args.output)
+    print(f"Episode {record['episode_id']} finished after {record['num_turns']} turns ({record['stop_reason']})")
+    if window_capture is not None:
+        window_capture.stop_continuous()
+    move.mc_socket.close()
+
+
+if __name__ == "__main__":
+    main()
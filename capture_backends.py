@@ -0,0 +1,529 @@
+# capture_backends.py
+"""Platform capture backends used by screenshot.WindowCapture.
+
+A backend lists windows and grabs one as a PIL Image. Windows are plain dicts:
+{'title', 'owner', 'bounds': {'X', 'Y', 'Width', 'Height'}, 'id'}.
+Native libraries are only loaded when a backend is created, so importing this
+module works everywhere.
+"""
+import os
+import sys
+import ctypes
+import ctypes.util
+import itertools
+
+from PIL import Image, ImageDraw
+
+
+def decode_bgrx(data, size, stride, into=None):
+    """RGB image from 32-bit BGRX rows, decoded into `into` when it fits."""
+    if into is not None and into.size == size and into.mode == "RGB":
+        into.frombytes(data, "raw", "BGRX", stride, 1)
+        return into
+    return Image.frombuffer("RGB", size, data, "raw", "BGRX", stride, 1)
+
+
+class CaptureBackend:
+    """Interface implemented by every capture backend."""
+
+    name = "base"
+
+    def list_windows(self):
+        """All capturable windows with a title."""
+        raise NotImplementedError
+
+    def window_info(self, window_id):
+        """Current info for one window id, or None if it is gone."""
+        for window in self.list_windows():
+            if window['id'] == window_id:
+                return window
+        return None
+
+    def grab(self, window, into=None):
+        """Capture a window as an RGB image, or None on failure.
+
+        If into is an RGB image of the window's size the pixels are written into
+        it and it is returned; otherwise a new image is allocated.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class QuartzBackend(CaptureBackend):
+    """macOS capture through Quartz.
+
+    The CGImage's pixel data is read straight into a PIL image (BGRA rows),
+    with no PNG encode/decode in between.
+    """
+
+    name = "quartz"
+
+    def __init__(self):
+        import Quartz
+        self.Quartz = Quartz
+
+    def window_from_info(self, window):
+        """Convert a Quartz window info dictionary into our window dict"""
+        Q = self.Quartz
+        return {
+            'title': window.get(Q.kCGWindowName, ''),
+            'owner': window.get(Q.kCGWindowOwnerName, ''),
+            'bounds': dict(window.get(Q.kCGWindowBounds, {})),
+            'id': window.get(Q.kCGWindowNumber, 0)
+        }
+
+    def list_windows(self):
+        Q = self.Quartz
+        try:
+            window_list = Q.CGWindowListCopyWindowInfo(Q.kCGWindowListOptionOnScreenOnly, Q.kCGNullWindowID)
+            return [self.window_from_info(window) for window in window_list
+                    if window.get(Q.kCGWindowName, '')]  # Only include windows with titles
+        except Exception as e:
+            print(f"Error in list_windows (Quartz): {e}")
+            return []
+
+    def window_info(self, window_id):
+        # A single native call for just this window
+        Q = self.Quartz
+        try:
+            window_list = Q.CGWindowListCopyWindowInfo(Q.kCGWindowListOptionIncludingWindow, window_id)
+            for window in window_list or []:
+                if window.get(Q.kCGWindowNumber, 0) == window_id:
+                    return self.window_from_info(window)
+        except Exception as e:
+            print(f"Error in window_info (Quartz): {e}")
+        return None
+
+    def grab(self, window, into=None):
+        Q = self.Quartz
+        bounds = window['bounds']
+        rect = Q.CGRectMake(int(bounds['X']), int(bounds['Y']), int(bounds['Width']), int(bounds['Height']))
+        try:
+            cgimage = Q.CGWindowListCreateImage(
+                rect,
+                Q.kCGWindowListOptionIncludingWindow,
+                window['id'],
+                Q.kCGWindowImageBoundsIgnoreFraming
+            )
+        except Exception as e:
+            print(f"Error capturing window with Quartz: {e}")
+            return None
+        if not cgimage:
+            print("Failed to capture window")
+            return None
+
+        # Window images are 32-bit little-endian alpha-first, i.e. BGRA in memory;
+        # anything else would be decoded as garbage
+        bits = Q.CGImageGetBitsPerPixel(cgimage)
+        info = Q.CGImageGetBitmapInfo(cgimage)
+        byte_order = info & Q.kCGBitmapByteOrderMask
+        alpha = info & Q.kCGBitmapAlphaInfoMask
+        if bits != 32 or byte_order != Q.kCGBitmapByteOrder32Little or alpha not in (
+                Q.kCGImageAlphaPremultipliedFirst, Q.kCGImageAlphaFirst, Q.kCGImageAlphaNoneSkipFirst):
+            print(f"Unsupported Quartz pixel format: {bits} bits per pixel, bitmap info {info:#x}")
+            return None
+        width = Q.CGImageGetWidth(cgimage)
+        height = Q.CGImageGetHeight(cgimage)
+        stride = Q.CGImageGetBytesPerRow(cgimage)
+        data = Q.CGDataProviderCopyData(Q.CGImageGetDataProvider(cgimage))
+        return decode_bgrx(bytes(data), (width, height), stride, into)
+
+
+# --- X11 structures (Xlib.h / XShm.h) ---
+
+class XImage(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_int), ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int), ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int), ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int), ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int), ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong), ("green_mask", ctypes.c_ulong), ("blue_mask", ctypes.c_ulong),
+        ("obdata", ctypes.c_void_p),
+        ("f", ctypes.c_void_p * 6),
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p), ("readOnly", ctypes.c_int),
+    ]
+
+
+class XWindowAttributes(ctypes.Structure):
+    _fields_ = [
+        ("x", ctypes.c_int), ("y", ctypes.c_int),
+        ("width", ctypes.c_int), ("height", ctypes.c_int),
+        ("border_width", ctypes.c_int), ("depth", ctypes.c_int),
+        ("visual", ctypes.c_void_p), ("root", ctypes.c_ulong),
+        ("class", ctypes.c_int), ("bit_gravity", ctypes.c_int),
+        ("win_gravity", ctypes.c_int), ("backing_store", ctypes.c_int),
+        ("backing_planes", ctypes.c_ulong), ("backing_pixel", ctypes.c_ulong),
+        ("save_under", ctypes.c_int), ("colormap", ctypes.c_ulong),
+        ("map_installed", ctypes.c_int), ("map_state", ctypes.c_int),
+        ("all_event_masks", ctypes.c_long), ("your_event_mask", ctypes.c_long),
+        ("do_not_propagate_mask", ctypes.c_long), ("override_redirect", ctypes.c_int),
+        ("screen", ctypes.c_void_p),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int), ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong), ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte), ("request_code", ctypes.c_ubyte), ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+
+# Last X protocol error code per display, read by X11Backend.sync_error
+_x_errors = {}
+
+
+@XErrorHandler
+def _record_x_error(display, event):
+    # Xlib's default handler exits the process (e.g. BadWindow once the game
+    # window closes); record the error for the caller instead
+    _x_errors[display] = event.contents.error_code
+    return 0
+
+
+ZPixmap = 2
+IsViewable = 2
+AnyPropertyType = 0
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+ALL_PLANES = 0xFFFFFFFF
+
+
+class X11Backend(CaptureBackend):
+    """Linux/X11 capture through the MIT-SHM extension (works under Xvfb).
+
+    The server copies the window straight into a shared-memory segment that is
+    reused between captures of the same size; the pixels are then wrapped with
+    Image.frombuffer and converted once into the returned frame.
+    """
+
+    name = "x11"
+
+    def __init__(self, display=None):
+        self.xlib = self._load("X11")
+        self.xext = self._load("Xext")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._declare()
+
+        name = (display or os.environ.get("DISPLAY", "")).encode() or None
+        self.display = self.xlib.XOpenDisplay(name)
+        if not self.display:
+            raise RuntimeError(f"Cannot open X display {display or os.environ.get('DISPLAY')!r}")
+        if not self.xext.XShmQueryExtension(self.display):
+            self.xlib.XCloseDisplay(self.display)
+            raise RuntimeError("X server does not support the MIT-SHM extension")
+        # Process-wide; the handler only records errors, so installing it twice is harmless
+        self.xlib.XSetErrorHandler(_record_x_error)
+        self.root = self.xlib.XDefaultRootWindow(self.display)
+        self.atoms = {}
+        # Shared-memory image, reused while the window size and visual stay the same
+        self.shm_key = None
+        self.shm_image = None
+        self.shm_info = XShmSegmentInfo()
+
+    @staticmethod
+    def _load(name):
+        path = ctypes.util.find_library(name)
+        if not path:
+            raise RuntimeError(f"lib{name} not found")
+        return ctypes.CDLL(path)
+
+    def _declare(self):
+        x, e, c = self.xlib, self.xext, self.libc
+        vp, ul = ctypes.c_void_p, ctypes.c_ulong
+        x.XOpenDisplay.restype = vp
+        x.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x.XCloseDisplay.argtypes = [vp]
+        x.XDefaultRootWindow.restype = ul
+        x.XDefaultRootWindow.argtypes = [vp]
+        x.XInternAtom.restype = ul
+        x.XInternAtom.argtypes = [vp, ctypes.c_char_p, ctypes.c_int]
+        x.XGetWindowProperty.argtypes = [vp, ul, ul, ctypes.c_long, ctypes.c_long, ctypes.c_int, ul,
+                                         ctypes.POINTER(ul), ctypes.POINTER(ctypes.c_int),
+                                         ctypes.POINTER(ul), ctypes.POINTER(ul), ctypes.POINTER(vp)]
+        x.XFetchName.argtypes = [vp, ul, ctypes.POINTER(ctypes.c_char_p)]
+        x.XQueryTree.argtypes = [vp, ul, ctypes.POINTER(ul), ctypes.POINTER(ul),
+                                 ctypes.POINTER(ctypes.POINTER(ul)), ctypes.POINTER(ctypes.c_uint)]
+        x.XGetWindowAttributes.argtypes = [vp, ul, ctypes.POINTER(XWindowAttributes)]
+        x.XTranslateCoordinates.argtypes = [vp, ul, ul, ctypes.c_int, ctypes.c_int,
+                                            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                                            ctypes.POINTER(ul)]
+        x.XFree.argtypes = [vp]
+        x.XSync.argtypes = [vp, ctypes.c_int]
+        x.XSetErrorHandler.restype = vp
+        x.XSetErrorHandler.argtypes = [XErrorHandler]
+        e.XShmQueryExtension.argtypes = [vp]
+        e.XShmCreateImage.restype = ctypes.POINTER(XImage)
+        e.XShmCreateImage.argtypes = [vp, vp, ctypes.c_uint, ctypes.c_int, vp,
+                                      ctypes.POINTER(XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint]
+        e.XShmAttach.argtypes = [vp, ctypes.POINTER(XShmSegmentInfo)]
+        e.XShmDetach.argtypes = [vp, ctypes.POINTER(XShmSegmentInfo)]
+        e.XShmGetImage.argtypes = [vp, ul, ctypes.POINTER(XImage), ctypes.c_int, ctypes.c_int, ul]
+        c.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        c.shmat.restype = vp
+        c.shmat.argtypes = [ctypes.c_int, vp, ctypes.c_int]
+        c.shmdt.argtypes = [vp]
+        c.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, vp]
+
+    def clear_error(self):
+        _x_errors.pop(self.display, None)
+
+    def sync_error(self):
+        """Wait for all requests sent so far; the X error code any of them raised, or 0."""
+        self.xlib.XSync(self.display, False)
+        return _x_errors.pop(self.display, 0)
+
+    def atom(self, name):
+        if name not in self.atoms:
+            self.atoms[name] = self.xlib.XInternAtom(self.display, name.encode(), False)
+        return self.atoms[name]
+
+    def get_property(self, window, name, length=1024):
+        """Raw bytes and item count of a window property, or (None, 0)."""
+        actual_type, actual_format = ctypes.c_ulong(), ctypes.c_int()
+        count, remaining = ctypes.c_ulong(), ctypes.c_ulong()
+        data = ctypes.c_void_p()
+        atom = self.atom(name)
+        self.clear_error()
+        status = self.xlib.XGetWindowProperty(
+            self.display, window, atom, 0, length, False, AnyPropertyType,
+            ctypes.byref(actual_type), ctypes.byref(actual_format),
+            ctypes.byref(count), ctypes.byref(remaining), ctypes.byref(data))
+        if self.sync_error() or status != 0 or not data.value:
+            if data.value:
+                self.xlib.XFree(data)
+            return None, 0
+        try:
+            # 32-bit format items are stored as C longs
+            item_size = {8: 1, 16: ctypes.sizeof(ctypes.c_short), 32: ctypes.sizeof(ctypes.c_long)}[actual_format.value]
+            return ctypes.string_at(data.value, item_size * count.value), count.value
+        finally:
+            self.xlib.XFree(data)
+
+    def client_windows(self):
+        """Top-level windows from the window manager, or the root's children without one (bare Xvfb)."""
+        raw, count = self.get_property(self.root, "_NET_CLIENT_LIST", length=4096)
+        if raw:
+            return list((ctypes.c_ulong * count).from_buffer_copy(raw))
+        root, parent = ctypes.c_ulong(), ctypes.c_ulong()
+        children, count = ctypes.POINTER(ctypes.c_ulong)(), ctypes.c_uint()
+        if not self.xlib.XQueryTree(self.display, self.root, ctypes.byref(root), ctypes.byref(parent),
+                                    ctypes.byref(children), ctypes.byref(count)):
+            return []
+        try:
+            return [children[i] for i in range(count.value)]
+        finally:
+            if children:
+                self.xlib.XFree(children)
+
+    def window_title(self, window):
+        raw, _ = self.get_property(window, "_NET_WM_NAME")
+        if raw:
+            return raw.decode("utf-8", "replace")
+        name = ctypes.c_char_p()
+        if self.xlib.XFetchName(self.display, window, ctypes.byref(name)) and name.value:
+            title = name.value.decode("latin-1")
+            self.xlib.XFree(ctypes.cast(name, ctypes.c_void_p))
+            return title
+        return ""
+
+    def window_owner(self, window):
+        raw, _ = self.get_property(window, "WM_CLASS")
+        # WM_CLASS is "instance\0class\0"
+        return raw.split(b"\0")[-2].decode("latin-1") if raw and b"\0" in raw else ""
+
+    def attributes(self, window):
+        """Window attributes, or None if the window is gone."""
+        attrs = XWindowAttributes()
+        self.clear_error()
+        status = self.xlib.XGetWindowAttributes(self.display, window, ctypes.byref(attrs))
+        if self.sync_error() or not status:
+            return None
+        return attrs
+
+    def window_dict(self, window, title=None):
+        attrs = self.attributes(window)
+        if attrs is None or attrs.map_state != IsViewable:
+            return None
+        x, y, child = ctypes.c_int(), ctypes.c_int(), ctypes.c_ulong()
+        self.xlib.XTranslateCoordinates(self.display, window, self.root, 0, 0,
+                                        ctypes.byref(x), ctypes.byref(y), ctypes.byref(child))
+        if self.sync_error():
+            return None  # Destroyed in between
+        return {
+            'title': self.window_title(window) if title is None else title,
+            'owner': self.window_owner(window),
+            'bounds': {'X': x.value, 'Y': y.value, 'Width': attrs.width, 'Height': attrs.height},
+            'id': window
+        }
+
+    def list_windows(self):
+        try:
+            windows = []
+            for window in self.client_windows():
+                title = self.window_title(window)
+                if title:  # Only include windows with titles
+                    info = self.window_dict(window, title)
+                    if info is not None:
+                        windows.append(info)
+            return windows
+        except Exception as e:
+            print(f"Error in list_windows (X11): {e}")
+            return []
+
+    def window_info(self, window_id):
+        try:
+            return self.window_dict(window_id)
+        except Exception as e:
+            print(f"Error in window_info (X11): {e}")
+            return None
+
+    def _release_shm(self):
+        if self.shm_image is None:
+            return
+        self.xext.XShmDetach(self.display, ctypes.byref(self.shm_info))
+        self.xlib.XSync(self.display, False)
+        # XDestroyImage is a macro over f.destroy_image, which would also free data
+        # (our shared segment), so release the pieces by hand
+        self.shm_image.contents.data = None
+        self.xlib.XFree(ctypes.cast(self.shm_image, ctypes.c_void_p))
+        self.libc.shmdt(self.shm_info.shmaddr)
+        self.shm_image = None
+        self.shm_key = None
+
+    def _shm_image(self, attrs):
+        """Shared-memory XImage for a window of this size/visual, allocated only when it changes."""
+        key = (attrs.width, attrs.height, attrs.depth, attrs.visual)
+        if key == self.shm_key:
+            return self.shm_image
+        self._release_shm()
+        image = self.xext.XShmCreateImage(self.display, attrs.visual, attrs.depth, ZPixmap, None,
+                                          ctypes.byref(self.shm_info), attrs.width, attrs.height)
+        if not image:
+            raise RuntimeError("XShmCreateImage failed")
+        size = image.contents.bytes_per_line * image.contents.height
+        shmid = self.libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if shmid < 0:
+            self.xlib.XFree(ctypes.cast(image, ctypes.c_void_p))
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        address = self.libc.shmat(shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            self.libc.shmctl(shmid, IPC_RMID, None)
+            self.xlib.XFree(ctypes.cast(image, ctypes.c_void_p))
+            raise OSError(ctypes.get_errno(), "shmat failed")
+        self.shm_info.shmid = shmid
+        self.shm_info.shmaddr = address
+        self.shm_info.readOnly = False
+        image.contents.data = address
+        self.clear_error()
+        self.xext.XShmAttach(self.display, ctypes.byref(self.shm_info))
+        error = self.sync_error()
+        # Marked for removal now; the segment lives until both sides detach
+        self.libc.shmctl(shmid, IPC_RMID, None)
+        if error:
+            self.libc.shmdt(address)
+            image.contents.data = None
+            self.xlib.XFree(ctypes.cast(image, ctypes.c_void_p))
+            raise RuntimeError(f"XShmAttach failed with X error {error}")
+        self.shm_image = image
+        self.shm_key = key
+        return image
+
+    def grab(self, window, into=None):
+        try:
+            attrs = self.attributes(window['id'])
+            if attrs is None or attrs.map_state != IsViewable:
+                print("Failed to capture window")
+                return None
+            image = self._shm_image(attrs)
+            self.clear_error()
+            status = self.xext.XShmGetImage(self.display, window['id'], image, 0, 0, ALL_PLANES)
+            # BadMatch when the window is partly off-screen, BadWindow once it is gone
+            error = self.sync_error()
+            if error or not status:
+                print(f"Failed to capture window (X error {error})" if error else "Failed to capture window")
+                return None
+            ximage = image.contents
+            if ximage.bits_per_pixel != 32:
+                print(f"Unsupported X11 pixel format: {ximage.bits_per_pixel} bits per pixel")
+                return None
+            buffer = (ctypes.c_char * (ximage.bytes_per_line * ximage.height)).from_address(ximage.data)
+            # Decoding BGRX into an RGB image is the one copy out of the shared segment,
+            # so the frame stays valid after the next grab overwrites the segment.
+            # With `into` even that image is reused
+            return decode_bgrx(buffer, (ximage.width, ximage.height), ximage.bytes_per_line, into)
+        except Exception as e:
+            print(f"Error capturing window with X11: {e}")
+            return None
+
+    def close(self):
+        if self.display:
+            self._release_shm()
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+
+class SyntheticBackend(CaptureBackend):
+    """Generated frames for tests and benchmarks; needs no display.
+
+    Exposes one window. Each grab returns a fresh frame with a marker that moves
+    every frame, so consecutive frames differ.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, width=1280, height=720, title="Synthetic Minecraft"):
+        self.window = {'title': title, 'owner': 'synthetic',
+                       'bounds': {'X': 0, 'Y': 0, 'Width': width, 'Height': height}, 'id': 1}
+        # Sky over grass, drawn once
+        self.background = Image.new("RGB", (width, height), (120, 170, 255))
+        ImageDraw.Draw(self.background).rectangle([0, height * 2 // 3, width, height], fill=(90, 160, 60))
+        self.counter = itertools.count()
+
+    def list_windows(self):
+        return [self.window]
+
+    def window_info(self, window_id):
+        return self.window if window_id == self.window['id'] else None
+
+    def grab(self, window, into=None):
+        if into is not None and into.size == self.background.size and into.mode == "RGB":
+            frame = into
+            frame.paste(self.background)
+        else:
+            frame = self.background.copy()
+        n = next(self.counter)
+        width, height = frame.size
+        size = max(8, height // 12)
+        x = (n * size) % max(1, width - size)
+        ImageDraw.Draw(frame).rectangle([x, height // 3, x + size, height // 3 + size], fill=(120, 80, 40))
+        return frame
+
+
+BACKENDS = {
+    "quartz": QuartzBackend,
+    "x11": X11Backend,
+    "synthetic": SyntheticBackend,
+}
+
+
+def create_backend(name=None):
+    """Create a backend by name; defaults to $CAPTURE_BACKEND, then the platform's native one."""
+    name = name or os.environ.get("CAPTURE_BACKEND") or ("quartz" if sys.platform == "darwin" else "x11")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown capture backend: {name}")
+    return BACKENDS[name]()
@@ -4,11 +4,15 @@ import org.bukkit.Bukkit;
 import org.bukkit.Location;
 import org.bukkit.entity.Player;
 import org.bukkit.plugin.java.JavaPlugin;
+import org.json.simple.JSONArray;
 import org.json.simple.JSONObject;
 import org.json.simple.parser.JSONParser;
 import org.json.simple.parser.ParseException;
 
 import java.net.InetSocketAddress;
+import java.util.ArrayList;
+import java.util.Iterator;
+import java.util.List;
 import java.util.logging.Logger;
 import org.java_websocket.server.WebSocketServer;
 import org.java_websocket.handshake.ClientHandshake;
@@ -51,19 +55,54 @@ public class MCWebSocket extends JavaPlugin {
 
             @Override
             public void onMessage(WebSocket conn, String message) {
+                // Echo the client's request id so replies (errors included) can be matched
+                // while many commands are in flight; null only if the frame had no readable id
+                Object id = null;
                 try {
                     JSONObject json = (JSONObject) parser.parse(message);
+                    id = json.get("id");
+                    final Object requestId = id;
+
+                    // A batch frame runs all of its actions in order within a single server tick
+                    JSONArray batch = (JSONArray) json.get("batch");
+                    if (batch != null) {
+                        // Check every action here, so a malformed batch gets the error reply
+                        // below instead of failing silently inside the scheduled task
+                        List<String> commands = new ArrayList<>();
+                        List<JSONObject> paramsList = new ArrayList<>();
+                        for (Object action : batch) {
+                            JSONObject actionJson = (JSONObject) action;
+                            commands.add((String) actionJson.get("command"));
+                            paramsList.add((JSONObject) actionJson.get("params"));
+                        }
+                        Bukkit.getScheduler().runTask(getPlugin(MCWebSocket.class), () -> {
+                            JSONArray results = new JSONArray();
+                            for (int i = 0; i < commands.size(); i++) {
+                                results.add(runCommand(commands.get(i), paramsList.get(i)));
+                            }
+                            JSONObject batchReply = reply(requestId, "ok", "batch");
+                            batchReply.put("results", results);
+                            batchReply.put("pose", pose(firstPlayer()));
+                            send(conn, batchReply);
+                        });
+                        return;
+                    }
+
                     String command = (String) json.get("command");
                     JSONObject params = (JSONObject) json.get("params");
                     
+                    // Reply only once the command has run on the main thread, so the client
+                    // knows the world has changed and gets the resulting pose
                     Bukkit.getScheduler().runTask(getPlugin(MCWebSocket.class), () -> {
-                        handleCommand(command, params);
+                        JSONObject result = runCommand(command, params);
+                        result.put("id", requestId);
+                        send(conn, result);
                     });
-                    
-                    conn.send("Command executed: " + command);
-                } catch (ParseException e) {
+                } catch (ParseException | ClassCastException e) {
                     logger.warning("Failed to parse message: " + e.getMessage());
-                    conn.send("Error: Invalid command format");
+                    JSONObject error = reply(id, "error", null);
+                    error.put("error", "Invalid command format");
+                    conn.send(error.toJSONString());
                 }
             }
 
@@ -80,10 +119,65 @@ public class MCWebSocket extends JavaPlugin {
         server.start();
     }
 
-    private void handleCommand(String command, JSONObject params) {
+    private static void send(WebSocket conn, JSONObject reply) {
+        // The client may have gone away while the task was queued
+        if (conn.isOpen()) {
+            conn.send(reply.toJSONString());
+        }
+    }
+
+    private static Player firstPlayer() {
+        Iterator<? extends Player> players = Bukkit.getOnlinePlayers().iterator();
+        return players.hasNext() ? players.next() : null;
+    }
+
+    @SuppressWarnings("unchecked")
+    private static JSONObject pose(Player player) {
+        if (player == null) return null;
+        Location loc = player.getLocation();
+        JSONObject pose = new JSONObject();
+        pose.put("x", loc.getX());
+        pose.put("y", loc.getY());
+        pose.put("z", loc.getZ());
+        pose.put("yaw", loc.getYaw());
+        pose.put("pitch", loc.getPitch());
+        return pose;
+    }
+
+    @SuppressWarnings("unchecked")
+    private static JSONObject reply(Object id, String status, String command) {
+        JSONObject reply = new JSONObject();
+        reply.put("id", id);
+        reply.put("status", status);
+        reply.put("command", command);
+        return reply;
+    }
+
+    // Run one command and report its outcome, so a failing action does not abort the rest of a batch
+    @SuppressWarnings("unchecked")
+    private JSONObject runCommand(String command, JSONObject params) {
+        JSONObject result = new JSONObject();
+        result.put("command", command);
+        try {
+            if (handleCommand(command, params)) {
+                result.put("status", "ok");
+            } else {
+                result.put("status", "error");
+                result.put("error", "Unknown command: " + command);
+            }
+        } catch (Exception e) {
+            logger.warning("Command " + command + " failed: " + e);
+            result.put("status", "error");
+            result.put("error", String.valueOf(e.getMessage()));
+        }
+        result.put("pose", pose(firstPlayer()));
+        return result;
+    }
+
+    private boolean handleCommand(String command, JSONObject params) {
         // Get the first player (or you could specify a player name in params)
-        Player player = Bukkit.getOnlinePlayers().iterator().next();
-        if (player == null) return;
+        Player player = firstPlayer();
+        if (player == null) throw new IllegalStateException("No player online");
 
         Location loc = player.getLocation();
         float yaw = loc.getYaw();
@@ -146,7 +240,11 @@ public class MCWebSocket extends JavaPlugin {
                     }
                 }
                 break;
+
+            default:
+                return false;
         }
+        return true;
     }
 
     private void stopWebSocketServer() {
@@ -0,0 +1,154 @@
+"""Send the same turn to several models at once and compare their replies.
+
+The conversation so far plus one new user message (text and, optionally, the
+current screenshot) goes to every model concurrently over the shared
+connection pool. The screenshot is encoded once and the same content part is
+used in every request.
+
+    python fanout.py --prompt "Open the door in front of you" --window Minecraft
+    python fanout.py --prompt "..." --models openai/gpt-4o-mini,anthropic/claude-3.5-sonnet --output compare.jsonl
+"""
+import os
+import copy
+import time
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from agent import AgentEngine, extract_command, describe_tool_calls, is_done, write_result
+
+DEFAULT_MODELS = [
+    "openai/chatgpt-4o-latest",
+    "openai/gpt-4o-mini",
+    "anthropic/claude-3.5-sonnet",
+    "google/gemini-2.0-pro-exp-02-05:free",
+]
+
+# (result key, column heading) of the comparison table
+COLUMNS = [
+    ("model", "Model"),
+    ("ttft_s", "TTFT (s)"),
+    ("total_s", "Total (s)"),
+    ("command", "Command"),
+    ("reply", "Reply"),
+]
+
+
+def ask_model(engine, messages, model):
+    """Stream one model's reply to messages. Returns its result dict."""
+    # A shallow copy shares the client, history and encoding cache but keeps its own
+    # per-request state, so every model can be asked at the same time
+    worker = copy.copy(engine)
+    worker.model_name = model
+    worker.hedge = None  # Compare the models themselves, not a fallback
+    started = time.perf_counter()
+    response = worker.chat_with_model_stream(messages)
+    timing = worker.last_timing or {}
+    if worker.tool_calls:
+        command = describe_tool_calls(worker.tool_calls)
+    else:
+        command = extract_command(response)
+    return {
+        "model": model,
+        "response": response,
+        "command": command,
+        "done": is_done(response),
+        "ttft_s": timing.get("ttft_s"),
+        "total_s": round(time.perf_counter() - started, 3),
+        "attempts": timing.get("attempts"),
+        "error": str(worker.last_error) if worker.last_error is not None else None,
+    }
+
+
+def fan_out(engine, text, models, image=None, image_part=None):
+    """Ask every model in models the same question and return the comparison record.
+
+    The engine's message history is sent as context but not changed. image is
+    encoded once (or an already built image_part is used) and attached to the
+    message every model gets.
+    """
+    content = engine.build_message_content(text, image=image, image_part=image_part)
+    messages = engine.messages + [{"role": "user", "content": content}]
+    started = time.perf_counter()
+    record = {
+        "compared_at": datetime.datetime.now().isoformat(),
+        "prompt": text,
+        "screenshot": any(part["type"] == "image_url" for part in content),
+        "context_messages": len(engine.messages),
+    }
+    with ThreadPoolExecutor(max_workers=max(1, len(models))) as pool:
+        record["results"] = list(pool.map(lambda model: ask_model(engine, messages, model), models))
+    record["wall_s"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def table_rows(record, width=60):
+    """One tuple of display strings per model, in COLUMNS order."""
+    rows = []
+    for result in record["results"]:
+        values = dict(result)
+        if result["error"] is not None:
+            values["reply"] = f"Error: {result['error']}"
+        else:
+            values["reply"] = " ".join((result["response"] or "").split())
+        row = []
+        for key, _ in COLUMNS:
+            value = values.get(key)
+            if value is None:
+                value = "-"
+            value = str(value)
+            if len(value) > width:
+                value = value[:width - 3] + "..."
+            row.append(value)
+        rows.append(tuple(row))
+    return rows
+
+
+def format_table(record, width=60):
+    """The comparison as a plain-text table."""
+    headings = [heading for _, heading in COLUMNS]
+    rows = table_rows(record, width)
+    widths = [max(len(cell) for cell in column) for column in zip(headings, *rows)]
+    lines = ["  ".join(cell.ljust(size) for cell, size in zip(headings, widths))]
+    lines.append("  ".join("-" * size for size in widths))
+    for row in rows:
+        lines.append("  ".join(cell.ljust(size) for cell, size in zip(row, widths)))
+    lines.append(f"{len(rows)} models in {record['wall_s']}s")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask several models the same question side by side.")
+    parser.add_argument("--prompt", required=True, help="User message sent to every model")
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS), help="Comma-separated model names")
+    parser.add_argument("--window", default=None, help="Title of the window to capture and attach (omit for text only)")
+    parser.add_argument("--capture-backend", default=None, choices=["quartz", "x11", "synthetic"])
+    parser.add_argument("--logs-dir", default="./logs")
+    parser.add_argument("--tools", action="store_true", help="Offer native tool calling instead of <<COMMAND>> text")
+    parser.add_argument("--api-key", default=None, help="Defaults to OPENROUTER_API_KEY")
+    parser.add_argument("--output", default=None, help="JSONL file the comparison record is appended to")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    api_key = args.api_key or os.environ.get("OPENROUTER_API_KEY")
+    if not api_key:
+        parser.error("No API key: pass --api-key or set OPENROUTER_API_KEY")
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+
+    window_capture = None
+    if args.window:
+        from screenshot import WindowCapture
+        window_capture = WindowCapture(args.logs_dir, backend=args.capture_backend)
+    engine = AgentEngine(api_key, models[0], window_capture=window_capture, window_title=args.window,
+                         use_tools=args.tools)
+    image = engine.capture_screenshot() if window_capture is not None else None
+    record = fan_out(engine, args.prompt, models, image=image)
+    print(format_table(record))
+    if args.output:
+        write_result(record, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import numpy as np
+from PIL import Image
+
+# Grayscale thumbnail the comparison runs on; box-downsampling averages away
+# JPEG-level noise and sub-pixel jitter while keeping real scene changes
+DIFF_SIZE = (64, 36)
+
+NO_CHANGE_NOTE = "No visual change since the previous screenshot; the last action had no visible effect."
+
+
+def thumbnail_array(image, size=DIFF_SIZE):
+    """Downsampled grayscale pixels of a frame as a float32 array."""
+    return np.asarray(image.convert("L").resize(size, Image.Resampling.BOX), dtype=np.float32)
+
+
+def dhash(pixels):
+    """64-bit difference hash (horizontal gradients of a 9x8 grayscale thumbnail)."""
+    small = np.asarray(Image.fromarray(pixels.astype(np.uint8)).resize((9, 8), Image.Resampling.BOX), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+class FrameDiffer:
+    """Decides whether a new frame differs visibly from the last one sent to the model.
+
+    Frames are compared on a small grayscale thumbnail. A frame counts as
+    unchanged when fewer than changed_fraction of the thumbnail's pixels moved by
+    more than pixel_threshold (0-255) and its dHash is within hash_distance bits.
+    The center-line overlay is identical in both frames, so it never counts.
+    """
+
+    def __init__(self, pixel_threshold=12, changed_fraction=0.005, hash_distance=2):
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.hash_distance = hash_distance
+        self.reset()
+
+    def reset(self):
+        self.last_pixels = None
+        self.last_hash = None
+        self.skipped = 0
+
+    def difference(self, image):
+        """Fraction of thumbnail pixels that changed against the last sent frame (1.0 if there is none)."""
+        pixels = thumbnail_array(image)
+        if self.last_pixels is None or self.last_pixels.shape != pixels.shape:
+            return 1.0, pixels
+        changed = np.abs(pixels - self.last_pixels) > self.pixel_threshold
+        return float(changed.mean()), pixels
+
+    def changed(self, image):
+        """True if the frame should be sent; it then becomes the reference for the next comparison."""
+        fraction, pixels = self.difference(image)
+        frame_hash = dhash(pixels)
+        if (fraction < self.changed_fraction and self.last_hash is not None
+                and bin(frame_hash ^ self.last_hash).count("1") <= self.hash_distance):
+            self.skipped += 1
+            return False
+        self.last_pixels = pixels
+        self.last_hash = frame_hash
+        return True
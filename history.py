@@ -0,0 +1,81 @@
+import json
+
+from image_encoding import estimate_image_tokens
+
+# Rough text budget: ~4 characters per token
+CHARS_PER_TOKEN = 4
+# Token estimate for image parts whose size was not recorded (a 768x768 high-detail frame)
+DEFAULT_IMAGE_TOKENS = estimate_image_tokens(768, 768)
+
+
+class HistoryManager:
+    """Keeps the agent's message list within a bounded context.
+
+    The system prompt and the images of the last keep_images frames are kept
+    verbatim. Older images are replaced in place by a short text stub such as
+    "frame 12: yaw=90.0, pitch=0.0, action=look_left(30)". If the estimated size
+    is still over max_tokens or max_bytes, the oldest turns are dropped, except
+    the first one, which carries the goal.
+    """
+
+    def __init__(self, keep_images=4, max_tokens=60000, max_bytes=20 * 1024 * 1024):
+        self.keep_images = keep_images
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.reset()
+
+    def reset(self):
+        self.frames = []  # [(message, stub, image tokens)] for messages still carrying an image
+        self.frame_count = 0
+
+    def add_frame(self, message, stub, tokens=None):
+        """Register a user message carrying an image, with the stub to use once it is evicted."""
+        if tokens is None:
+            tokens = DEFAULT_IMAGE_TOKENS
+        self.frame_count += 1
+        self.frames.append((message, f"frame {self.frame_count}: {stub}", tokens))
+
+    def evict_images(self):
+        """Replace images older than the last keep_images frames with their stubs."""
+        while len(self.frames) > self.keep_images:
+            message, stub, _ = self.frames.pop(0)
+            message["content"] = [
+                {"type": "text", "text": stub} if part.get("type") == "image_url" else part
+                for part in message["content"]
+            ]
+
+    def estimate(self, messages):
+        """Return (bytes, tokens) estimates for a message list."""
+        image_tokens = {id(message): tokens for message, _, tokens in self.frames}
+        total_bytes = 0
+        total_tokens = 0
+        for message in messages:
+            total_bytes += len(json.dumps(message))
+            content = message.get("content")
+            if isinstance(content, str):
+                total_tokens += len(content) // CHARS_PER_TOKEN
+                continue
+            for part in content or []:
+                if part.get("type") == "image_url":
+                    total_tokens += image_tokens.get(id(message), DEFAULT_IMAGE_TOKENS)
+                else:
+                    total_tokens += len(part.get("text", "")) // CHARS_PER_TOKEN
+        return total_bytes, total_tokens
+
+    def trim(self, messages):
+        """Bound the message list in place before a model call. Returns (bytes, tokens)."""
+        self.evict_images()
+        total_bytes, total_tokens = self.estimate(messages)
+        while total_tokens > self.max_tokens or total_bytes > self.max_bytes:
+            # Drop the oldest turn after the goal: a user message and every reply up
+            # to the next user message. The system prompt, the first user message (the
+            # goal; follow-ups only say a command ran) and the latest user message are
+            # never dropped.
+            starts = [i for i, message in enumerate(messages) if i > 0 and message["role"] == "user"]
+            if len(starts) < 3:
+                break
+            dropped = messages[starts[1]:starts[2]]
+            del messages[starts[1]:starts[2]]
+            self.frames = [frame for frame in self.frames if not any(frame[0] is m for m in dropped)]
+            total_bytes, total_tokens = self.estimate(messages)
+        return total_bytes, total_tokens
@@ -0,0 +1,222 @@
+import io
+import base64
+import hashlib
+import threading
+import math
+import weakref
+from collections import OrderedDict
+
+from PIL import Image
+
+MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "PNG": "image/png",
+}
+
+# High-detail image handling from openai_vision_doc.txt: the provider scales the image to
+# fit a 2048px square, then so the shortest side is 768px, and bills 170 tokens per 512px tile
+PROVIDER_MAX_SIDE = 2048
+PROVIDER_SHORT_SIDE = 768
+TILE_SIZE = 512
+
+
+def encode_image_to_base64(image):
+    """Encodes a PIL Image object to base64."""
+    buffered = io.BytesIO()
+    image.save(buffered, format="PNG")
+    img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    return img_str
+
+
+def estimate_image_tokens(width, height, detail="high"):
+    """Estimate vision tokens for an image of this size (openai_vision_doc.txt)."""
+    if detail == "low":
+        return 85
+    width, height = provider_size(width, height)
+    tiles = math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE)
+    return 85 + 170 * tiles
+
+
+def provider_size(width, height):
+    """Size the provider actually looks at in high-detail mode (it never upscales)."""
+    scale = min(1.0, PROVIDER_MAX_SIDE / max(width, height), PROVIDER_SHORT_SIDE / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class EncodingPolicy:
+    """How screenshots are resized and compressed before upload.
+
+    format: "JPEG", "WEBP" or "PNG"; quality applies to the lossy formats.
+    max_dimension: cap on the longest side in pixels (None for no cap).
+    fit_provider: pre-apply the provider's own high-detail downscale, so no pixels
+        are uploaded that the model would never see.
+    tile_snap: if set (e.g. 0.8), shrink further down onto the 512px tile grid when
+        that saves tiles and keeps at least this fraction of the size.
+    detail: optional "low"/"high"/"auto" hint sent with the image.
+    """
+
+    def __init__(self, format="JPEG", quality=85, max_dimension=None, fit_provider=True,
+                 tile_snap=None, detail=None):
+        format = format.upper()
+        if format not in MIME_TYPES:
+            raise ValueError(f"Unsupported image format: {format}")
+        self.format = format
+        self.quality = quality
+        self.max_dimension = max_dimension
+        self.fit_provider = fit_provider
+        self.tile_snap = tile_snap
+        self.detail = detail
+
+    @property
+    def mime_type(self):
+        return MIME_TYPES[self.format]
+
+    @property
+    def variant(self):
+        """Cache key component identifying this policy's output."""
+        return f"{self.format}:{self.quality}:{self.max_dimension}:{self.fit_provider}:{self.tile_snap}"
+
+    def target_size(self, width, height):
+        """Output size for a frame of the given size."""
+        if self.fit_provider:
+            width, height = provider_size(width, height)
+        if self.max_dimension and max(width, height) > self.max_dimension:
+            scale = self.max_dimension / max(width, height)
+            width, height = max(1, round(width * scale)), max(1, round(height * scale))
+        if self.tile_snap:
+            tiles = math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE)
+            # Largest scale that drops one column or row of tiles
+            for scale in sorted((TILE_SIZE * math.floor((side - 1) / TILE_SIZE) / side
+                                 for side in (width, height) if side > TILE_SIZE), reverse=True):
+                if scale < self.tile_snap:
+                    break
+                w, h = math.floor(width * scale), math.floor(height * scale)
+                if math.ceil(w / TILE_SIZE) * math.ceil(h / TILE_SIZE) < tiles:
+                    width, height = w, h
+                    break
+        return width, height
+
+    def prepare(self, image):
+        """Resize and convert the frame for encoding."""
+        size = self.target_size(*image.size)
+        if size != image.size:
+            # Area-averaging LANCZOS keeps the thin yellow center-line overlay visible
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        if self.format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        return image
+
+    def encode(self, image):
+        """Resize, compress and base64-encode the frame."""
+        image = self.prepare(image)
+        buffered = io.BytesIO()
+        if self.format == "JPEG":
+            # No chroma subsampling: 4:2:0 smears the yellow overlay and its labels
+            image.save(buffered, format="JPEG", quality=self.quality, subsampling=0)
+        elif self.format == "WEBP":
+            image.save(buffered, format="WEBP", quality=self.quality)
+        else:
+            image.save(buffered, format="PNG")
+        return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+    def image_part(self, payload):
+        """Content part for a user message carrying an encoded payload."""
+        image_url = {"url": f"data:{self.mime_type};base64,{payload}"}
+        if self.detail:
+            image_url["detail"] = self.detail
+        return {"type": "image_url", "image_url": image_url}
+
+
+def content_hash(image):
+    """Stable hash of an image's pixels, mode and size."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.mode}:{image.size}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class EncodingCache:
+    """Bounded LRU cache of encoded screenshots.
+
+    Lookups first go by frame identity (the same PIL object sent again, which is
+    the common case when re-sending a screenshot with a follow-up question) and
+    then by content hash. Frames must not be modified in place after they are
+    encoded; every capture path in this repo produces a fresh image.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (payload, size)
+        self.total_bytes = 0
+        self.identity = {}  # id(image) -> (weakref to image, key)
+        # Re-entrant: the weakref callback can run during GC while the lock is held
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _identity_key(self, image):
+        entry = self.identity.get(id(image))
+        if entry is not None and entry[0]() is image:
+            return entry[1]
+        return None
+
+    def _remember_identity(self, image, key):
+        image_id = id(image)
+
+        def forget(_ref, image_id=image_id):
+            with self.lock:
+                entry = self.identity.get(image_id)
+                if entry is not None and entry[0] is _ref:
+                    del self.identity[image_id]
+
+        try:
+            self.identity[image_id] = (weakref.ref(image, forget), key)
+        except TypeError:
+            pass  # Not weak-referenceable; content hashing still works
+
+    def encode(self, image, encoder=encode_image_to_base64, variant=""):
+        """Return (payload, size) for the image, encoding it only on a cache miss.
+
+        variant distinguishes different encodings of the same frame.
+        """
+        with self.lock:
+            key = self._identity_key(image)
+            if key is not None and (key, variant) in self.entries:
+                self.entries.move_to_end((key, variant))
+                self.hits += 1
+                return self.entries[(key, variant)]
+
+        key = content_hash(image)
+        with self.lock:
+            self._remember_identity(image, key)
+            if (key, variant) in self.entries:
+                self.entries.move_to_end((key, variant))
+                self.hits += 1
+                return self.entries[(key, variant)]
+            self.misses += 1
+
+        payload = encoder(image)
+        result = (payload, len(payload))
+        with self.lock:
+            if (key, variant) not in self.entries:
+                self.entries[(key, variant)] = result
+                self.total_bytes += result[1]
+            self.entries.move_to_end((key, variant))
+            # Evict least recently used entries, always keeping the newest one
+            while len(self.entries) > 1 and (len(self.entries) > self.max_entries
+                                             or self.total_bytes > self.max_bytes):
+                _, (_, size) = self.entries.popitem(last=False)
+                self.total_bytes -= size
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.identity.clear()
+            self.total_bytes = 0
+
+
+# Shared cache used by the agent engine
+default_cache = EncodingCache()
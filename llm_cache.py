@@ -0,0 +1,123 @@
+import os
+import json
+import base64
+import hashlib
+import threading
+
+MODES = ("record", "replay", "passthrough")
+
+
+def normalize_messages(messages):
+    """Copy of the messages with inline images replaced by a hash of their encoded image bytes.
+
+    The base64 payload is decoded first, so differences in padding or line breaks
+    do not change the key, and the key does not depend on megabytes of text. The
+    hash covers the encoded JPEG/WebP/PNG file, so the same pixels sent at another
+    format or quality (which the model also sees differently) get a different key.
+    """
+    normalized = []
+    for message in messages:
+        message = dict(message)
+        content = message.get("content")
+        if isinstance(content, list):
+            parts = []
+            for part in content:
+                if part.get("type") == "image_url":
+                    image_url = dict(part["image_url"])
+                    url = image_url.get("url", "")
+                    if url.startswith("data:"):
+                        header, _, payload = url.partition(",")
+                        digest = hashlib.sha256(base64.b64decode(payload)).hexdigest()
+                        image_url["url"] = f"{header},sha256:{digest}"
+                    part = dict(part, image_url=image_url)
+                parts.append(part)
+            message["content"] = parts
+        normalized.append(message)
+    return normalized
+
+
+def request_key(params, messages):
+    """Stable hash of (model, sampling params, normalized messages)."""
+    params = {key: value for key, value in params.items() if key != "stream"}
+    canonical = json.dumps({"params": params, "messages": normalize_messages(messages)},
+                           sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk cache of model responses for replays and regression runs.
+
+    mode is one of:
+      record      - serve hits from disk, call the model on a miss and store the result
+      replay      - serve hits only; a miss is an error (no API calls at all)
+      passthrough - never read or write the cache
+    Entries are one JSON file per request. When the directory grows past max_bytes
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir="./llm_cache", mode="record", max_bytes=512 * 1024 * 1024):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(entry.stat().st_size for entry in os.scandir(cache_dir)
+                               if entry.name.endswith(".json"))
+
+    @property
+    def enabled(self):
+        return self.mode != "passthrough"
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the stored response dict for a key, or None."""
+        path = self.path(key)
+        try:
+            with open(path, "r") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            # Touch for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store a response dict under a key (record mode only)."""
+        if self.mode != "record":
+            return
+        path = self.path(key)
+        data = json.dumps(value).encode("utf-8")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self.lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.total_bytes += len(data) - old_size
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = sorted((entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".json")),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self.total_bytes -= size
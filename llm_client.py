@@ -0,0 +1,372 @@
+import time
+import queue
+import socket
+import random
+import threading
+import importlib.util
+import email.utils
+from collections import deque
+
+import httpx
+from openai import OpenAI, APIStatusError, APIConnectionError, APITimeoutError
+
+# Status codes worth retrying: rate limits and transient provider/gateway errors
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+# Explicit timeouts: fail fast on a dead connection, allow slow generations
+DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=90.0, write=30.0, pool=10.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=120.0)
+
+_http_client = None
+_clients = {}
+_lock = threading.Lock()
+
+
+def http2_available():
+    """HTTP/2 needs the optional h2 package."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def shared_http_client():
+    """The process-wide httpx client; keeps connections (and TLS sessions) alive between requests."""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(http2=http2_available(), timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS)
+        return _http_client
+
+
+def retry_after_seconds(headers):
+    """Delay requested by a Retry-After (or retry-after-ms) header, or None."""
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HedgePolicy:
+    """When to send a duplicate ("hedge") request, and to which model.
+
+    The hedge fires if the first token has not arrived after the percentile-th
+    percentile of recent times to first token for the model (default_deadline
+    until min_samples are known), clamped to [min_deadline, max_deadline].
+    fallback_model is the model the hedge goes to (None for the same model).
+    max_wait bounds the wait for a first token from either request once the
+    hedge decision is made; after it both are cancelled and TimeoutError raised.
+    """
+
+    def __init__(self, percentile=95, min_samples=8, default_deadline=8.0, min_deadline=1.0,
+                 max_deadline=30.0, fallback_model=None, max_wait=180.0):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_deadline = default_deadline
+        self.min_deadline = min_deadline
+        self.max_deadline = max_deadline
+        self.fallback_model = fallback_model
+        self.max_wait = max_wait
+
+    def deadline(self, timings, model):
+        """Seconds to wait for a first token before hedging."""
+        samples = sorted(timing["ttft_s"] for timing in list(timings)
+                         if timing.get("model") == model and "ttft_s" in timing)
+        if len(samples) < self.min_samples:
+            return self.default_deadline
+        rank = min(len(samples) - 1, int(round(self.percentile / 100 * (len(samples) - 1))))
+        return max(self.min_deadline, min(self.max_deadline, samples[rank]))
+
+
+def has_payload(chunk):
+    """True for a stream chunk carrying content or tool-call deltas (not just the role)."""
+    if not chunk.choices:
+        return False
+    delta = chunk.choices[0].delta
+    return bool(delta.content or delta.tool_calls)
+
+
+class RequestCancelled(Exception):
+    """create() was cancelled before it got a response."""
+
+
+def abort_stream(stream):
+    """Close a stream, also waking a thread blocked reading it.
+
+    Closing alone does not interrupt a blocked read, so on HTTP/1.1 the socket
+    (which belongs to this response only) is shut down first. HTTP/2 streams
+    share their connection and are only closed.
+    """
+    response = getattr(stream, "response", None)
+    if response is not None and response.http_version == "HTTP/1.1":
+        network_stream = response.extensions.get("network_stream")
+        sock = network_stream.get_extra_info("socket") if network_stream is not None else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+    stream.close()
+
+
+class _Race:
+    """Shared state of a primary request and its hedge."""
+
+    END = object()
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.decided = threading.Event()  # set when someone won, or every started request failed
+        self.cancel = threading.Event()  # set once there is a winner; stops the loser's retries
+        self.winner = None
+        self.abandoned = False
+        self.started = []
+        self.streams = {}
+        self.timings = {}
+        self.errors = {}
+        self.chunks = queue.Queue()
+
+    def start(self, name):
+        """Enter a request into the race. False if there is already a winner (it is not started)."""
+        with self.lock:
+            if self.winner is not None:
+                return False
+            self.started.append(name)
+            self.decided.clear()
+            return True
+
+    def claim(self, name):
+        """Called by a request on its first token; True if it won. Cancels the others."""
+        with self.lock:
+            if self.winner is None and not self.abandoned:
+                self.winner = name
+                self.decided.set()
+                self.cancel.set()
+                for other, stream in self.streams.items():
+                    if other != name:
+                        abort_stream(stream)
+            return self.winner == name
+
+    def abandon(self):
+        """Give up waiting: nobody can win any more and every request is cancelled."""
+        with self.lock:
+            if self.winner is not None:
+                return
+            self.abandoned = True
+            self.cancel.set()
+            for stream in self.streams.values():
+                abort_stream(stream)
+
+    def register(self, name, stream, timing):
+        """Record a request's open stream. False if it has already lost (the stream is then closed)."""
+        with self.lock:
+            self.timings[name] = timing
+            if self.winner is not None or self.abandoned:
+                stream.close()
+                return False
+            self.streams[name] = stream
+            return True
+
+    def fail(self, name, error):
+        with self.lock:
+            self.errors[name] = error
+            if self.winner is None and len(self.errors) == len(self.started):
+                self.decided.set()
+
+
+class LLMClient:
+    """OpenAI-compatible chat client on the shared connection pool, with retries.
+
+    Retries 429/5xx replies and connection errors up to max_retries times with
+    exponential backoff and full jitter, waiting at least as long as the
+    server's Retry-After (capped at max_retry_after). Only the request itself
+    is retried; a stream that fails part way through is not.
+
+    create() returns (result, timing). timing is a dict with the model, number
+    of attempts, seconds spent waiting between them, the final HTTP status and
+    response_s (time until the response headers, which for a stream is before
+    the first token). Streaming callers add ttft_s and total_s themselves.
+    The last timings are kept in recent_timings.
+    """
+
+    def __init__(self, api_key, base_url=None, max_retries=4, backoff_base=0.5, backoff_max=20.0,
+                 max_retry_after=60.0, http_client=None):
+        self.openai = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client or shared_http_client(),
+                             timeout=DEFAULT_TIMEOUT, max_retries=0)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.recent_timings = deque(maxlen=200)
+
+    def backoff(self, attempt, headers=None):
+        """Seconds to wait before retry number attempt (1-based)."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        requested = retry_after_seconds(headers)
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_retry_after))
+        return delay
+
+    def create(self, cancel=None, **params):
+        """chat.completions.create with retries. Returns (completion or stream, timing).
+
+        cancel: optional threading.Event; once set, no further attempt is made
+        and RequestCancelled is raised instead of waiting out a backoff.
+        """
+        timing = {"model": params.get("model"), "stream": bool(params.get("stream")),
+                  "attempts": 0, "retry_wait_s": 0.0, "status": None}
+        started = time.perf_counter()
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled(f"Request to {params.get('model')} cancelled")
+            timing["attempts"] += 1
+            try:
+                result = self.openai.chat.completions.create(**params)
+                timing["status"] = 200
+                timing["response_s"] = round(time.perf_counter() - started, 3)
+                self.recent_timings.append(timing)
+                return result, timing
+            except APIStatusError as e:
+                timing["status"] = e.status_code
+                if e.status_code not in RETRY_STATUSES or timing["attempts"] > self.max_retries:
+                    raise
+                delay = self.backoff(timing["attempts"], e.response.headers)
+                print(f"LLM request failed with {e.status_code}; retrying in {delay:.1f}s")
+            except (APIConnectionError, APITimeoutError) as e:
+                timing["status"] = "timeout" if isinstance(e, APITimeoutError) else "connection_error"
+                if timing["attempts"] > self.max_retries:
+                    raise
+                delay = self.backoff(timing["attempts"])
+                print(f"LLM request failed ({e}); retrying in {delay:.1f}s")
+            if cancel is not None:
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
+            timing["retry_wait_s"] = round(timing["retry_wait_s"] + delay, 3)
+
+    def create_hedged(self, policy, **params):
+        """Streaming create() that hedges a slow first token. Returns (chunk iterator, timing).
+
+        The primary request starts at once. If it has not produced a token
+        within the policy's deadline (or fails before then), the same request
+        goes to policy.fallback_model, or the same model again. Whichever
+        produces a token first wins. The loser is cancelled at once: its stream
+        is aborted (dropping the connection, so the server stops generating)
+        and it makes no further retries. timing is the winner's, with a "hedge"
+        entry saying whether the hedge fired and which request won.
+        """
+        params = dict(params, stream=True)
+        deadline = policy.deadline(self.recent_timings, params.get("model"))
+        race = _Race()
+
+        def run(name, run_params):
+            sent = time.perf_counter()
+            try:
+                stream, timing = self.create(cancel=race.cancel, **run_params)
+            except Exception as e:
+                race.fail(name, e)
+                return
+            if not race.register(name, stream, timing):
+                return
+            early = []  # role-only chunks seen before the first token
+            try:
+                for chunk in stream:
+                    if race.winner == name:
+                        race.chunks.put(chunk)
+                    elif race.winner is not None:
+                        break
+                    elif not has_payload(chunk):
+                        early.append(chunk)
+                    elif race.claim(name):
+                        timing["ttft_s"] = round(time.perf_counter() - sent, 3)
+                        for item in early + [chunk]:
+                            race.chunks.put(item)
+                    else:
+                        break
+                if race.winner is None:
+                    race.fail(name, Exception("No response received from the API"))
+            except Exception as e:
+                if race.winner == name:
+                    race.chunks.put(e)
+                else:
+                    race.fail(name, e)
+            finally:
+                if race.winner == name:
+                    race.chunks.put(_Race.END)
+                else:
+                    stream.close()
+
+        def start(name, run_params):
+            if not race.start(name):
+                return False
+            threading.Thread(target=run, args=(name, run_params), daemon=True).start()
+            return True
+
+        started = time.perf_counter()
+        start("primary", params)
+        race.decided.wait(deadline)
+        hedge_model = policy.fallback_model or params.get("model")
+        # Not started if the primary won since the wait above
+        fired = start("hedge", dict(params, model=hedge_model))
+        if fired:
+            if "primary" in race.errors:
+                print(f"LLM request failed ({race.errors['primary']}); hedging with {hedge_model}")
+            else:
+                print(f"No first token after {deadline:.1f}s; hedging with {hedge_model}")
+        if not race.decided.wait(policy.max_wait):
+            race.abandon()
+        if race.winner is None:
+            # Nobody produced a token: report the hedge's failure, else the primary's
+            error = race.errors.get("hedge") or race.errors.get("primary")
+            if error is None:
+                raise TimeoutError(f"No first token from {params.get('model')} within {policy.max_wait:.0f}s")
+            raise error
+
+        with race.lock:
+            for name, timing in race.timings.items():
+                if name != race.winner:
+                    # The loser's first token would have come later than this; keep that
+                    # in the samples so hedging does not pull the deadline down
+                    timing["ttft_s"] = round(time.perf_counter() - started, 3)
+        winner_stream = race.streams[race.winner]
+        timing = race.timings[race.winner]
+        timing["hedge"] = {"deadline_s": round(deadline, 3), "fired": fired, "winner": race.winner}
+
+        def chunks():
+            try:
+                while True:
+                    item = race.chunks.get()
+                    if item is _Race.END:
+                        return
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                winner_stream.close()
+
+        return chunks(), timing
+
+
+def get_llm_client(api_key, base_url=None):
+    """Shared LLMClient for an API key and base URL (all of them share one connection pool)."""
+    key = (api_key, base_url)
+    with _lock:
+        client = _clients.get(key)
+    if client is None:
+        client = LLMClient(api_key, base_url)
+        with _lock:
+            client = _clients.setdefault(key, client)
+    return client
@@ -5,21 +5,30 @@ import os
 import platform
 import time
 import datetime
-import io
-import base64
 import threading
 import json
 
 # --- Import OpenRouter/OpenAI client ---
-from openai import OpenAI, APIError
+from openai import APIError
+# --- Import the headless agent engine ---
+from agent import AgentEngine, write_result
+from llm_client import HedgePolicy
+# --- Side-by-side model comparison ---
+from fanout import fan_out, table_rows, COLUMNS
 
 # --- Import the new screenshot module ---
 from screenshot import WindowCapture
+# --- Preview images built off the Tk thread ---
+from preview import PreviewService
+# --- Bounded chat transcript ---
+from transcript import Transcript
 # --- Import move.py ---
 import MCPI_Scripts.move as move
 # --- Import door module ---
 from MCPI_Scripts.door import check_for_door  # This should now just import the function without executing it
 from MCPI_Scripts.move import mc_socket
+# --- The Action Panel's sequences use the same name(args) parser as model commands ---
+from tools import ToolError, default_registry, plugin_actions
 
 # Global variable to store the most recent screenshot (PIL Image)
 current_screenshot = None
@@ -82,6 +91,15 @@ model_options = [
 model_var = tk.StringVar(value="openai/chatgpt-4o-latest")
 model_combobox = ttk.Combobox(model_frame, textvariable=model_var, values=model_options, state="readonly", width=25)
 model_combobox.pack(side=tk.TOP, anchor="w")
+# Hedge slow requests: re-send to the same or a fallback model when the first token is late
+fallback_label = tk.Label(model_frame, text="Hedge slow requests:")
+fallback_label.pack(side=tk.TOP, anchor="w")
+HEDGE_OFF = "Off"
+HEDGE_SAME = "Same model"
+fallback_var = tk.StringVar(value=HEDGE_OFF)
+fallback_combobox = ttk.Combobox(model_frame, textvariable=fallback_var, values=[HEDGE_OFF, HEDGE_SAME] + model_options,
+                                 state="readonly", width=25)
+fallback_combobox.pack(side=tk.TOP, anchor="w")
 
 # Right: Openrouter API key text field
 api_frame = tk.Frame(top_frame)
@@ -162,7 +180,7 @@ logs_output_button.pack(fill=tk.X)
 def open_action_panel():
     popup = tk.Toplevel(root)
     popup.title("Action Panel")
-    popup.geometry("400x350")  # Made taller to accommodate new field
+    popup.geometry("400x380")  # Made taller to accommodate new fields
     
     # Add padding and spacing
     padding = {'padx': 10, 'pady': 5}
@@ -220,6 +238,24 @@ def open_action_panel():
     message_button = tk.Button(popup, text="Send", command=lambda: move.post_to_chat(message_var.get()))
     message_button.grid(row=7, column=2)
 
+    # Sequence section: several actions sent as one batch frame and run in one server tick
+    tk.Label(popup, text="Sequence").grid(row=8, column=0, sticky="w", **padding)
+    sequence_var = tk.StringVar(value="look_left(30); move_forward(2)")
+    sequence_entry = tk.Entry(popup, textvariable=sequence_var, width=20)
+    sequence_entry.grid(row=8, column=1, padx=5)
+
+    def run_sequence():
+        try:
+            actions = plugin_actions(default_registry.parse_sequence(sequence_var.get()))
+        except ToolError as e:
+            messagebox.showerror("Error", f"Invalid sequence: {e}")
+            return
+        if actions:
+            move.send_batch(actions)
+
+    sequence_button = tk.Button(popup, text="Run", command=run_sequence)
+    sequence_button.grid(row=8, column=2)
+
     # Configure column weights to make the window more responsive
     popup.grid_columnconfigure(0, weight=1)
     popup.grid_columnconfigure(1, weight=1)
@@ -240,6 +276,8 @@ def browse_directory(var):
 
 # --- Integrated Window Selection and Capture (for screenshots) ---
 window_capture = WindowCapture(logs_output_var.get())
+# Captures and preview resizes run on a worker so the GUI stays responsive
+preview_service = PreviewService(root)
 selected_window_var = tk.StringVar()
 
 def select_window():
@@ -274,17 +312,19 @@ def take_screenshot():
         messagebox.showwarning("Warning", "No window selected.")
         return
     selected_title = window_title.split(" - ", 1)[1]
-    img = window_capture.capture_and_save(selected_title)
-    if img:
-        # For display on the main GUI, resize the image (if desired)
-        display_img = img.resize((580, 380), Image.Resampling.LANCZOS)
-        screenshot_tk = ImageTk.PhotoImage(display_img)
-        screenshot_canvas.create_image(0, 0, anchor=tk.NW, image=screenshot_tk)
-        screenshot_canvas.image = screenshot_tk
-        global current_screenshot
-        current_screenshot = img  # store the PIL screenshot for use in the ChatWindow
-    else:
-        messagebox.showerror("Error", "Failed to capture screenshot.")
+
+    def on_ready(img, photos):
+        if img:
+            # For display on the main GUI, the 580x380 preview level
+            screenshot_tk = photos["canvas"]
+            screenshot_canvas.create_image(0, 0, anchor=tk.NW, image=screenshot_tk)
+            screenshot_canvas.image = screenshot_tk
+            global current_screenshot
+            current_screenshot = img  # store the PIL screenshot for use in the ChatWindow
+        else:
+            messagebox.showerror("Error", "Failed to capture screenshot.")
+
+    preview_service.submit(lambda: window_capture.capture_and_save(selected_title), on_ready, names=["canvas"])
 
 # Create right panel for screenshot display
 screenshot_frame = tk.Frame(center_frame)
@@ -343,69 +383,30 @@ except Exception as e:
     mc = None
 
 # ----------------------------------------------------------------
-# Helper function for image encoding (used in ChatWindow)
-def encode_image_to_base64(image):
-    """Encodes a PIL Image object to base64."""
-    buffered = io.BytesIO()
-    image.save(buffered, format="PNG")
-    img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
-    return img_str
-
-# ----------------------------------------------------------------
-# ChatWindow class (integrated chat functionality from openrouter.py)
+# ChatWindow class (Tk front end over the headless AgentEngine in agent.py)
 class ChatWindow:
-    # Class variable for system prompt
-    SYSTEM_PROMPT = """You are a Minecraft assistant. When you want to execute an action, 
-    output it in the following format (only one command at a time):
-    <<COMMAND>>
-    action_name(parameter)
-    <<END>>
-
-    Available commands:
-    - move_forward(distance)
-    - look_left(degrees)
-    - look_right(degrees)
-    - look_up(degrees)
-    - look_down(degrees)
-    - open_door()
-
-    Important: 
-    - Only issue one command at a time. Wait for feedback before issuing another command.
-    - When making degree adjustments, always compare the current viewpoint's centered position to the target's position.
-    - Always reassess the current view position when a new screenshot is provided, as it indicates a change in perspective, as the degrees on the axis are relative to the new screenshot.
-
-    Always provide a reason for the action, then output the command in the specified format.
-    Example:
-    I'll move forward 10 blocks to reach the house.
-    <<COMMAND>>
-    move_forward(10)
-    <<END>>
-    """
-
     def __init__(self, master, api_key, model, window_capture, selected_window_title, initial_screenshot=None):
         self.master = master
         self.api_key = api_key
         self.model_name = model
         # Add references to the main GUI variables
         self.model_var = model_var  # Add reference to model_var
+        self.fallback_var = fallback_var
         self.selected_window_var = selected_window_var  # Add reference to selected_window_var
         
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=os.environ.get("OPENROUTER_BASE_URL")
-        )
-        
-        # Initialize messages with system prompt using class variable
-        self.messages = [{
-            "role": "system",
-            "content": self.SYSTEM_PROMPT  # Using the class variable here
-        }]
         # Use the shared WindowCapture and selected window title passed from main GUI.
         self.window_capture = window_capture
         self.selected_window_title = selected_window_title
+
+        # The engine owns the message history, model client and command execution
+        self.engine = AgentEngine(self.api_key, self.model_name,
+                                  window_capture=window_capture,
+                                  window_title=selected_window_title,
+                                  stream=True)
+        self.streaming = False
+        self.update_hedge()
         
         # Use the shared screenshot if provided
-        self.screenshot_history = []
         self.screenshot_image = initial_screenshot  if initial_screenshot is not None else None
         self.screenshot_tk = None
 
@@ -420,6 +421,8 @@ class ChatWindow:
         self.chat_display.tag_configure('assistant', foreground='green', font=('TkDefaultFont', 14))
         self.chat_display.tag_configure('center', justify='center')
         self.chat_display.configure(font=('TkDefaultFont', 14))
+        # Batches inserts and keeps only the recent thumbnails in memory
+        self.transcript = Transcript(self.chat_display, preview_service)
         
         # Message Entry
         self.message_entry = ttk.Entry(master, width=60, font=('TkDefaultFont', 12))
@@ -435,6 +438,12 @@ class ChatWindow:
         self.screenshot_button.pack(side=tk.LEFT, padx=5)
         self.clear_chat_button = ttk.Button(button_frame, text="Clear Chat", command=self.clear_chat)
         self.clear_chat_button.pack(side=tk.LEFT, padx=5)
+        self.autonomous_button = ttk.Button(button_frame, text="Run Autonomous", command=self.start_autonomous)
+        self.autonomous_button.pack(side=tk.LEFT, padx=5)
+        self.stop_button = ttk.Button(button_frame, text="Stop", command=self.engine.stop, state='disabled')
+        self.stop_button.pack(side=tk.LEFT, padx=5)
+        self.compare_button = ttk.Button(button_frame, text="Compare Models", command=self.open_compare)
+        self.compare_button.pack(side=tk.LEFT, padx=5)
         
         # Loading indicator
         self.loading_label = tk.Label(master, text="")
@@ -458,19 +467,30 @@ class ChatWindow:
         
         # Add trace to model_var to update when changed
         self.model_var.trace_add("write", self.update_model)
+        self.fallback_var.trace_add("write", self.update_hedge)
         # Add trace to selected_window_var to update when changed
         self.selected_window_var.trace_add("write", self.update_selected_window)
     
     def update_model(self, *args):
         """Update the model when changed in main GUI"""
         self.model_name = self.model_var.get()
+        self.engine.model_name = self.model_name
         # Now this will work since model_label is an instance variable
         self.model_label.config(text=f"Model: {self.model_name}")
 
+    def update_hedge(self, *args):
+        """Apply the hedge setting from the main GUI"""
+        choice = self.fallback_var.get()
+        if choice == HEDGE_OFF:
+            self.engine.hedge = None
+        else:
+            self.engine.hedge = HedgePolicy(fallback_model=None if choice == HEDGE_SAME else choice)
+
     def update_selected_window(self, *args):
         """Update the selected window when changed in main GUI"""
         if self.selected_window_var.get():
             self.selected_window_title = self.selected_window_var.get().split(" - ", 1)[1]
+            self.engine.window_title = self.selected_window_title
             self.add_message("System", "Window selection updated.")
 
     def capture_and_display_screenshot(self):
@@ -481,24 +501,24 @@ class ChatWindow:
             return
         
         selected_title = self.selected_window_var.get().split(" - ", 1)[1]
-        img = self.window_capture.capture_and_save(selected_title)
-        
+        self.screenshot_button.config(state='disabled')
+        # Capture and all preview sizes are built on the preview worker
+        preview_service.submit(lambda: self.window_capture.capture_and_save(selected_title),
+                               self.show_captured_screenshot)
+
+    def show_captured_screenshot(self, img, photos):
+        self.screenshot_button.config(state='normal')
         if img:
             # Store the original image
             self.screenshot_image = img
             global current_screenshot
             current_screenshot = img
 
-            # Create thumbnail for chat window
-            max_width = 300
-            ratio = max_width / img.width
-            new_height = int(img.height * ratio)
-            chat_thumbnail = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-            self.screenshot_tk = ImageTk.PhotoImage(chat_thumbnail)
+            # Thumbnail for chat window
+            self.screenshot_tk = photos["chat"]
 
-            # Create display version for main GUI
-            display_img = img.resize((580, 380), Image.Resampling.LANCZOS)
-            main_screenshot_tk = ImageTk.PhotoImage(display_img)
+            # Display version for main GUI
+            main_screenshot_tk = photos["canvas"]
             self.main_screenshot_canvas.create_image(0, 0, anchor=tk.NW, image=main_screenshot_tk)
             self.main_screenshot_canvas.image = main_screenshot_tk
 
@@ -507,22 +527,12 @@ class ChatWindow:
             messagebox.showerror("Error", "Failed to capture screenshot.")
     
     def add_message(self, role, content, tag=None):
-        self.chat_display.config(state='normal')
-        if tag:
-            self.chat_display.insert(tk.END, f"{role}: {content}\n", tag)
-        else:
-            self.chat_display.insert(tk.END, f"{role}: {content}\n")
+        self.transcript.add(f"{role}: {content}\n", tag)
         if role == "You" and self.screenshot_image:
-            thumbnail_size = (200, 150)
-            thumbnail = self.screenshot_image.copy()
-            thumbnail.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(thumbnail)
-            self.screenshot_history.append(photo)
-            self.chat_display.insert(tk.END, '\n', 'center')
-            self.chat_display.image_create(tk.END, image=photo)
-            self.chat_display.insert(tk.END, '\n\n', 'center')
-        self.chat_display.config(state='disabled')
-        self.chat_display.see(tk.END)
+            # 200x150 history thumbnail from the frame's cached preview pyramid
+            self.transcript.add('\n', 'center')
+            self.transcript.add_image(self.screenshot_image)
+            self.transcript.add('\n\n', 'center')
     
     def show_loading(self, show=True):
         if show:
@@ -534,66 +544,182 @@ class ChatWindow:
             self.send_button.config(state='normal')
             self.message_entry.config(state='normal')
     
-    def chat_with_model(self, messages):
-        try:
-            # Add debug logging
-            print(f"Sending message to {self.model_name}")
-            print(f"Number of messages in context: {len(messages)}")
-            print(f"Latest message type: {type(messages[-1]['content'])}")
-            
-            chat_completion = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                max_tokens=1024,
-                temperature=0.7,
-                top_p=1,
-                seed=12345,
-                user="my-test-user",
-            )
-            
-            if not chat_completion or not chat_completion.choices:
-                print("Debug: Received empty response from API")
-                print(f"Full API response: {chat_completion}")
-                raise Exception("No response received from the API")
-            
-            response = chat_completion.choices[0].message.content
-            return response
-        except APIError as e:
-            print(f"API Error details: {str(e)}")
-            messagebox.showerror("API Error", f"OpenAI API Error: {e}")
-            return None
-        except Exception as e:
-            print(f"Unexpected error details: {str(e)}")
-            print(f"Last message content: {messages[-1]['content'] if messages else 'No messages'}")
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-            return None
-    
+    def show_error(self, error):
+        if isinstance(error, APIError):
+            messagebox.showerror("API Error", f"OpenAI API Error: {error}")
+        else:
+            messagebox.showerror("Error", f"An unexpected error occurred: {error}")
+
     def send_message_thread(self, user_input, message_content):
-        self.messages.append({"role": "user", "content": message_content})
         try:
-            response = self.chat_with_model(self.messages)
+            on_token = lambda text: self.master.after(0, lambda: self.append_stream(text))
+            response = self.engine.send(message_content, self.screenshot_image, on_token=on_token)
+            error = self.engine.last_error
+            if response is None and error is not None:
+                self.master.after(0, lambda: self.show_error(error))
             self.master.after(0, lambda: self.handle_response(response))
         finally:
             self.master.after(0, lambda: self.show_loading(False))
     
+    def append_stream(self, text):
+        """Render streamed tokens into the chat display as they arrive (batched by the transcript)."""
+        if not self.streaming:
+            self.streaming = True
+            self.transcript.add("Model: ", 'assistant')
+        self.transcript.add(text, 'assistant')
+
     def handle_response(self, response):
-        if response:
+        if self.streaming:
+            # The text is already on screen; just finish the line
+            self.streaming = False
+            self.transcript.add("\n")
+        elif response:
             self.add_message("Model", response, 'assistant')
-            self.messages.append({"role": "assistant", "content": response})
-            # Try to execute any commands in the response
-            execute_command(response)
+        if response is not None:
+            # Try to execute any commands in the response (already running if streamed)
+            self.engine.handle_response(response)
     
+    def start_autonomous(self):
+        """Run an autonomous episode using the entry text as the goal, honouring Max Turns."""
+        goal = self.message_entry.get()
+        if not goal:
+            messagebox.showwarning("Warning", "Enter a goal in the message box first.")
+            return
+        if not self.selected_window_var.get():
+            messagebox.showerror("Error", "No window selected. Please select a window from the main interface.")
+            return
+        try:
+            max_turns = max_turns_var.get()
+        except tk.TclError:
+            messagebox.showwarning("Warning", "Please enter a valid Max Turns value.")
+            return
+        self.message_entry.delete(0, tk.END)
+        self.transcript.clear()
+        self.add_message("System", f"Autonomous run started (max {max_turns} turns): {goal}")
+        self.show_loading(True)
+        self.autonomous_button.config(state='disabled')
+        self.stop_button.config(state='normal')
+        thread = threading.Thread(
+            target=self.autonomous_thread,
+            args=(goal, max_turns),
+            daemon=True
+        )
+        thread.start()
+
+    def autonomous_thread(self, goal, max_turns):
+        def on_turn(turn_record, image):
+            if image is not None:
+                # Build the previews here, off the Tk thread; show_turn then hits the cache
+                preview_service.levels(image)
+            self.master.after(0, lambda: self.show_turn(turn_record, image))
+        try:
+            record = self.engine.run_episode(goal, max_turns, on_turn=on_turn)
+            write_result(record, os.path.join(logs_output_var.get(), "episodes.jsonl"))
+            self.master.after(0, lambda: self.finish_autonomous(record))
+        except Exception as e:
+            # e.g. a network or socket failure outside the model call
+            error = e
+            self.master.after(0, lambda: self.fail_autonomous(error))
+        finally:
+            # Always give the buttons back, whatever happened to the episode
+            self.master.after(0, self.end_autonomous)
+
+    def show_turn(self, turn_record, image):
+        if image is not None:
+            self.screenshot_image = image
+        self.add_message("You", f"[turn {turn_record['turn']}]", 'user')
+        self.add_message("Model", turn_record["response"], 'assistant')
+
+    def end_autonomous(self):
+        self.show_loading(False)
+        self.autonomous_button.config(state='normal')
+        self.stop_button.config(state='disabled')
+
+    def fail_autonomous(self, error):
+        self.add_message("System", f"Autonomous run failed: {error}")
+        self.show_error(error)
+
+    def finish_autonomous(self, record):
+        self.add_message("System", f"Autonomous run finished after {record['num_turns']} turns ({record['stop_reason']}).")
+        if record["stop_reason"] == "error":
+            self.show_error(self.engine.last_error)
+
+    def open_compare(self):
+        """Window that sends the entry text and current screenshot to several models at once."""
+        top = tk.Toplevel(self.master)
+        top.title("Compare Models")
+        top.geometry("900x500")
+        choices = tk.Frame(top)
+        choices.pack(fill=tk.X, padx=10, pady=(10, 0))
+        selected = []
+        for model in model_options:
+            var = tk.BooleanVar(value=True)
+            ttk.Checkbutton(choices, text=model, variable=var).pack(side=tk.LEFT, padx=(0, 10))
+            selected.append((model, var))
+        run_button = ttk.Button(choices, text="Run", command=lambda: self.run_compare(top, selected, tree, detail, run_button))
+        run_button.pack(side=tk.RIGHT)
+
+        tree = ttk.Treeview(top, columns=[key for key, _ in COLUMNS], show="headings", height=6)
+        for key, heading in COLUMNS:
+            tree.heading(key, text=heading)
+            tree.column(key, width=420 if key == "reply" else 110, anchor="w", stretch=key == "reply")
+        tree.pack(fill=tk.X, padx=10, pady=10)
+        # Full reply of the selected row
+        detail = scrolledtext.ScrolledText(top, wrap=tk.WORD, state='disabled', height=10)
+        detail.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        tree.bind("<<TreeviewSelect>>", lambda event: self.show_compare_detail(tree, detail))
+
+    def run_compare(self, top, selected, tree, detail, run_button):
+        prompt = self.message_entry.get() or "What do you see, and what would you do next?"
+        models = [model for model, var in selected if var.get()]
+        if not models:
+            messagebox.showwarning("Warning", "Select at least one model to compare.", parent=top)
+            return
+        run_button.config(state='disabled')
+        tree.delete(*tree.get_children())
+        top.title(f"Compare Models - waiting for {len(models)} models...")
+
+        def worker():
+            try:
+                # The screenshot is encoded once and shared by every request
+                record = fan_out(self.engine, prompt, models, image=self.screenshot_image)
+            except Exception as e:
+                record = None
+                error = e
+                self.master.after(0, lambda: self.show_error(error))
+            self.master.after(0, lambda: self.show_compare(top, record, tree, detail, run_button))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_compare(self, top, record, tree, detail, run_button):
+        if not top.winfo_exists():
+            return
+        run_button.config(state='normal')
+        if record is None:
+            top.title("Compare Models")
+            return
+        top.title(f"Compare Models - {len(record['results'])} models in {record['wall_s']}s")
+        tree.results = {}
+        for row, result in zip(table_rows(record), record["results"]):
+            item = tree.insert("", tk.END, values=row)
+            tree.results[item] = result
+        write_result(record, os.path.join(logs_output_var.get(), "comparisons.jsonl"))
+
+    def show_compare_detail(self, tree, detail):
+        selection = tree.selection()
+        result = getattr(tree, "results", {}).get(selection[0]) if selection else None
+        if result is None:
+            return
+        detail.config(state='normal')
+        detail.delete('1.0', tk.END)
+        detail.insert(tk.END, (result["response"] or "") if result["error"] is None else f"Error: {result['error']}")
+        detail.config(state='disabled')
+
     def clear_chat(self):
-        self.messages = [{
-            "role": "system",
-            "content": self.SYSTEM_PROMPT
-        }]
-        self.chat_display.config(state='normal')
-        self.chat_display.delete('1.0', tk.END)
-        self.chat_display.config(state='disabled')
+        self.engine.reset()
+        self.transcript.clear()
         self.screenshot_image = None
         self.screenshot_tk = None
-        self.screenshot_history = []
     
     def send_message(self, event=None):
         user_input = self.message_entry.get()
@@ -601,14 +727,8 @@ class ChatWindow:
             return
         self.add_message("You", user_input, 'user')
         self.message_entry.delete(0, tk.END)
-        message_content = [{"type": "text", "text": user_input}]
         # If a screenshot is available, attach it without clearing it.
-        if self.screenshot_image:
-            base64_image = encode_image_to_base64(self.screenshot_image)
-            message_content.append({
-                "type": "image_url",
-                "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
-            })
+        message_content = self.engine.build_message_content(user_input, self.screenshot_image)
         self.show_loading(True)
         thread = threading.Thread(
             target=self.send_message_thread,
@@ -617,41 +737,6 @@ class ChatWindow:
         )
         thread.start()
 
-def execute_command(command_str):
-    """Execute a command from the LLM."""
-    try:
-        # Extract command between markers
-        if "<<COMMAND>>" not in command_str or "<<END>>" not in command_str:
-            return False
-            
-        command = command_str.split("<<COMMAND>>")[1].split("<<END>>")[0].strip()
-        
-        # Parse the command
-        parts = command.split("(")
-        if len(parts) != 2:
-            return False
-            
-        action = parts[0].strip()
-        args = [arg.strip() for arg in parts[1].rstrip(")").split(",")]
-        
-        # Execute the appropriate function
-        if action == "move_forward":
-            move.move_forward(mc, int(args[0]))
-        elif action == "look_left":
-            move.look_left(mc, int(args[0]))
-        elif action == "look_right":
-            move.look_right(mc, int(args[0]))
-        elif action == "look_up":
-            move.look_up(mc, int(args[0]))
-        elif action == "look_down":
-            move.look_down(mc, int(args[0]))
-        elif action == "open_door":
-            check_for_door(mc)  # Pass the mc connection
-        return True
-    except Exception as e:
-        print(f"Error executing command: {e}")
-        return False
-
 # ----------------------------------------------------------------
 # Start the main event loop
 root.mainloop()
\ No newline at end of file
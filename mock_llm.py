@@ -0,0 +1,294 @@
+"""Local OpenAI-compatible chat-completions server for offline runs and benchmarks.
+
+Replies come from a script (a JSON list of strings, used in turn) or from
+built-in rules that walk through a few <<COMMAND>> blocks and then <<DONE>>.
+Time to first token and tokens per second are simulated, streaming (SSE) is
+supported, and 429/5xx faults can be injected at a rate, every Nth request,
+per request (X-Mock-Fault header) or on demand (POST /mock/faults).
+
+    python mock_llm.py --port 8800 --ttft 0.4 --tps 60
+    OPENROUTER_BASE_URL=http://localhost:8800/v1 python agent.py --goal ...
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+import itertools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Commands the rule-based replies cycle through (see agent.SYSTEM_PROMPT)
+RULE_COMMANDS = [
+    ("look_left", {"degrees": 30}),
+    ("move_forward", {"distance": 2}),
+    ("look_right", {"degrees": 15}),
+    ("open_door", {}),
+]
+
+ERROR_TYPES = {
+    429: "rate_limit_exceeded",
+    500: "server_error",
+    502: "bad_gateway",
+    503: "service_unavailable",
+    504: "gateway_timeout",
+}
+
+# Words plus their trailing whitespace stand in for tokens
+TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text)
+
+
+class MockLLM:
+    """Reply generation, timing and fault state shared by all request handlers.
+
+    ttft: seconds before the first token; tps: tokens per second after it
+    (0 for instant); jitter: up to this fraction of random extra delay.
+    fault_rate / fault_every: inject fault_status with probability fault_rate,
+    or on every fault_every-th request. retry_after: seconds sent in the
+    Retry-After header of injected 429/503 replies (None to omit it).
+    """
+
+    def __init__(self, script=None, done_after=4, ttft=0.3, tps=50.0, jitter=0.0,
+                 fault_rate=0.0, fault_every=0, fault_status=429, retry_after=1.0, seed=None):
+        self.script = script
+        self.done_after = done_after
+        self.ttft = ttft
+        self.tps = tps
+        self.jitter = jitter
+        self.fault_rate = fault_rate
+        self.fault_every = fault_every
+        self.fault_status = fault_status
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.queued_faults = []  # [status, remaining, retry_after] set through POST /mock/faults
+        self.request_ids = itertools.count(1)
+        self.stats = {"requests": 0, "faults": 0, "streamed": 0, "completion_tokens": 0}
+
+    def delay(self, seconds):
+        if self.jitter:
+            seconds *= 1 + self.random.uniform(0, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def token_delay(self):
+        return 1.0 / self.tps if self.tps else 0.0
+
+    def queue_fault(self, status, count=1, retry_after=None):
+        with self.lock:
+            self.queued_faults.append([status, count, retry_after if retry_after is not None else self.retry_after])
+
+    def next_fault(self, forced=None):
+        """(status, retry_after) of the fault to inject into this request, or None."""
+        with self.lock:
+            self.stats["requests"] += 1
+            number = self.stats["requests"]
+            fault = None
+            if forced:
+                fault = (forced, self.retry_after)
+            elif self.queued_faults:
+                entry = self.queued_faults[0]
+                fault = (entry[0], entry[2])
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    self.queued_faults.pop(0)
+            elif self.fault_every and number % self.fault_every == 0:
+                fault = (self.fault_status, self.retry_after)
+            elif self.fault_rate and self.random.random() < self.fault_rate:
+                fault = (self.fault_status, self.retry_after)
+            if fault:
+                self.stats["faults"] += 1
+            return fault
+
+    def reply(self, request):
+        """(text, tool_calls) for a chat-completions request body."""
+        messages = request.get("messages", [])
+        turn = sum(1 for message in messages if message.get("role") == "user")
+        if self.script:
+            text = self.script[(turn - 1) % len(self.script)]
+            return text, []
+        if turn > self.done_after:
+            return "The goal looks complete from this view. <<DONE>>", []
+        name, arguments = RULE_COMMANDS[(turn - 1) % len(RULE_COMMANDS)]
+        if request.get("tools"):
+            call = {
+                "id": f"call_mock_{next(self.request_ids)}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }
+            return f"Calling {name}.", [call]
+        args = ", ".join(str(value) for value in arguments.values())
+        return f"I'll run {name} to make progress.\n<<COMMAND>>\n{name}({args})\n<<END>>", []
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mock = None  # MockLLM, set on the server's handler class
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # The client dropped a kept-alive connection (e.g. a cancelled stream)
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path.endswith("/models"):
+            self.send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]})
+        elif self.path == "/mock/stats":
+            with self.mock.lock:
+                self.send_json(200, dict(self.mock.stats))
+        else:
+            self.send_json(404, {"error": {"message": f"Not found: {self.path}", "type": "not_found"}})
+
+    def do_POST(self):
+        try:
+            body = self.read_body()
+        except ValueError:
+            self.send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+        if self.path == "/mock/faults":
+            self.mock.queue_fault(int(body.get("status", 429)), int(body.get("count", 1)), body.get("retry_after"))
+            self.send_json(200, {"queued": True})
+        elif self.path.endswith("/chat/completions"):
+            self.chat_completions(body)
+        else:
+            self.send_json(404, {"error": {"message": f"Not found: {self.path}", "type": "not_found"}})
+
+    def chat_completions(self, request):
+        mock = self.mock
+        forced = self.headers.get("X-Mock-Fault")
+        fault = mock.next_fault(int(forced) if forced else None)
+        if fault:
+            status, retry_after = fault
+            headers = {}
+            if retry_after is not None and status in (429, 503):
+                headers["Retry-After"] = f"{retry_after:g}"
+            self.send_json(status, {"error": {"message": f"Injected fault {status}",
+                                              "type": ERROR_TYPES.get(status, "server_error"),
+                                              "code": status}}, headers)
+            return
+
+        text, tool_calls = mock.reply(request)
+        tokens = tokenize(text)
+        completion_id = f"chatcmpl-mock-{next(mock.request_ids)}"
+        model = request.get("model", "mock")
+        created = int(time.time())
+        prompt_tokens = sum(len(tokenize(json.dumps(message.get("content")))) for message in request.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                 "total_tokens": prompt_tokens + len(tokens)}
+        finish_reason = "tool_calls" if tool_calls else "stop"
+        with mock.lock:
+            mock.stats["completion_tokens"] += len(tokens)
+
+        if not request.get("stream"):
+            mock.delay(mock.ttft + len(tokens) * mock.token_delay())
+            message = {"role": "assistant", "content": text}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            self.send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            })
+            return
+
+        with mock.lock:
+            mock.stats["streamed"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta, finish=None, extra=None):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            if extra:
+                chunk.update(extra)
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n")
+
+        try:
+            mock.delay(mock.ttft)
+            event({"role": "assistant", "content": ""})
+            for i, token in enumerate(tokens):
+                if i:
+                    mock.delay(mock.token_delay())
+                event({"content": token})
+            for index, call in enumerate(tool_calls):
+                event({"tool_calls": [dict(call, index=index)]})
+            event({}, finish_reason, {"usage": usage})
+            self.write_chunk("data: [DONE]\n\n")
+            self.write_chunk("")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away mid-stream
+            self.close_connection = True
+
+    def write_chunk(self, text):
+        """Write one HTTP/1.1 chunk (an empty one ends the body)."""
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def create_server(mock, host="localhost", port=8800):
+    """HTTP server for a MockLLM; call serve_forever() (or run it on a thread)."""
+    handler = type("BoundMockHandler", (MockHandler,), {"mock": mock})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat-completions server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--script", default=None, help="JSON file with a list of replies, used turn by turn")
+    parser.add_argument("--done-after", type=int, default=4, help="Rule-based replies say <<DONE>> after this many turns")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Seconds to first token")
+    parser.add_argument("--tps", type=float, default=50.0, help="Tokens per second after the first (0 for instant)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra delay, as a fraction")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="Probability of injecting a fault per request")
+    parser.add_argument("--fault-every", type=int, default=0, help="Inject a fault on every Nth request")
+    parser.add_argument("--fault-status", type=int, default=429, help="HTTP status of injected faults (429 or 5xx)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on injected 429/503")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    mock = MockLLM(script=script, done_after=args.done_after, ttft=args.ttft, tps=args.tps, jitter=args.jitter,
+                   fault_rate=args.fault_rate, fault_every=args.fault_every, fault_status=args.fault_status,
+                   retry_after=args.retry_after, seed=args.seed)
+    server = create_server(mock, args.host, args.port)
+    print(f"Mock LLM listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,21 @@ import base64
 import io
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-from openai import OpenAI, APIError
+from openai import APIError
 from dotenv import load_dotenv
 from PIL import Image, ImageTk
 import threading
 
 # Assuming screenshot.py is in the same directory
 from screenshot import WindowCapture
+# Shared pooled client with retries (the same one the agent engine uses)
+from llm_client import get_llm_client
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.environ.get("OPENROUTER_API_KEY"),
-    base_url=os.environ.get("OPENROUTER_BASE_URL"),
+client = get_llm_client(
+    os.environ.get("OPENROUTER_API_KEY"),
+    os.environ.get("OPENROUTER_BASE_URL"),
 )
 
 def encode_image_to_base64(image):
@@ -28,7 +30,7 @@ def encode_image_to_base64(image):
 def chat_with_model(model_name, messages):
     """Sends messages to the model and returns the response."""
     try:
-        chat_completion = client.chat.completions.create(
+        chat_completion, timing = client.create(
             model=model_name,
             messages=messages,
             max_tokens=1024,
@@ -38,6 +40,7 @@ def chat_with_model(model_name, messages):
             user="my-test-user",
         )
         response = chat_completion.choices[0].message.content
+        print(f"{model_name}: {timing['response_s']}s after {timing['attempts']} attempt(s)")
         return response
     except APIError as e:
         messagebox.showerror("API Error", f"OpenAI API Error: {e}")
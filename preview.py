@@ -0,0 +1,115 @@
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageTk
+
+# Display sizes used by the GUI: name -> (width, height, how)
+#   stretch - exactly width x height (the main screenshot canvas)
+#   width   - width wide, height following the frame's aspect ratio
+#   fit     - fit inside width x height, keeping the aspect ratio
+PREVIEW_SIZES = {
+    "canvas": (580, 380, "stretch"),
+    "chat": (300, None, "width"),
+    "history": (200, 150, "fit"),
+}
+
+
+def target_size(spec, size):
+    """Pixel size of a preview level for a frame of the given size."""
+    width, height, how = spec
+    src_width, src_height = size
+    if how == "stretch":
+        return width, height
+    if how == "width":
+        return width, max(1, int(src_height * width / src_width))
+    scale = min(width / src_width, height / src_height, 1.0)
+    return max(1, round(src_width * scale)), max(1, round(src_height * scale))
+
+
+def build_pyramid(image, sizes=PREVIEW_SIZES):
+    """All preview levels for one frame, largest first, each built from the previous level.
+
+    Every level is resized from the smallest already-built level that is at
+    least as large in both dimensions (the frame itself for the first), so a
+    Retina frame is read in full once. Big reductions first use Image.reduce,
+    a cheap integer box filter, and finish with LANCZOS.
+    """
+    targets = sorted(((name, target_size(spec, image.size)) for name, spec in sizes.items()),
+                     key=lambda item: item[1][0] * item[1][1], reverse=True)
+    levels = {}
+    built = [image]
+    for name, (width, height) in targets:
+        source = min((level for level in built if level.width >= width and level.height >= height),
+                     key=lambda level: level.width * level.height, default=image)
+        factor = min(source.width // width, source.height // height) // 2
+        if factor >= 2:
+            source = source.reduce(factor)
+        levels[name] = source if source.size == (width, height) else source.resize((width, height),
+                                                                                  Image.Resampling.LANCZOS)
+        built.append(levels[name])
+    return levels
+
+
+class PreviewService:
+    """Builds the GUI's preview images for a frame on a worker thread.
+
+    Levels are cached for the last few frames (by identity), so every widget
+    showing the same frame reuses one pyramid. PhotoImages are created on the
+    Tk thread in the completion callback, as Tk requires.
+    """
+
+    def __init__(self, master, sizes=PREVIEW_SIZES, max_frames=8):
+        self.master = master
+        self.sizes = sizes
+        self.max_frames = max_frames
+        self.cache = OrderedDict()  # id(image) -> (weakref to image, levels)
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=1)
+
+    def levels(self, image):
+        """Preview levels for a frame, built now unless already cached. Safe from any thread."""
+        with self.lock:
+            entry = self.cache.get(id(image))
+            if entry is not None and entry[0]() is image:
+                self.cache.move_to_end(id(image))
+                return entry[1]
+        levels = build_pyramid(image, self.sizes)
+        with self.lock:
+            try:
+                self.cache[id(image)] = (weakref.ref(image), levels)
+            except TypeError:
+                return levels
+            while len(self.cache) > self.max_frames:
+                self.cache.popitem(last=False)
+        return levels
+
+    def preview(self, image, name):
+        """One preview level (a PIL image) for a frame."""
+        return self.levels(image)[name]
+
+    def submit(self, source, on_ready, names=None):
+        """Produce a frame and its previews off the Tk thread.
+
+        source is a PIL image or a callable returning one (e.g. a capture), run
+        on the worker. on_ready(image, photos) is then called on the Tk thread with
+        {name: PhotoImage} for names (default: all sizes); image is None if the
+        source produced nothing.
+        """
+        names = names or list(self.sizes)
+
+        def work():
+            try:
+                image = source() if callable(source) else source
+                levels = self.levels(image) if image is not None else {}
+            except Exception as e:
+                print(f"Error building previews: {e}")
+                image, levels = None, {}
+            self.master.after(0, lambda: deliver(image, levels))
+
+        def deliver(image, levels):
+            photos = {name: ImageTk.PhotoImage(levels[name]) for name in names if name in levels}
+            on_ready(image, photos)
+
+        return self.pool.submit(work)
@@ -2,32 +2,251 @@
 from PIL import Image
 import os
 import time
-import io
-# --- Quartz and Cocoa imports ---
-from Quartz import (
-    CGWindowListCopyWindowInfo,
-    kCGWindowListOptionOnScreenOnly,
-    kCGNullWindowID,
-    kCGWindowBounds,
-    kCGWindowName,
-    kCGWindowOwnerName,
-    kCGWindowNumber,
-    kCGWindowListOptionIncludingWindow,
-    CGWindowListCreateImage,
-    CGRectMake,
-    kCGWindowImageBoundsIgnoreFraming
-)
-import Cocoa
+import queue
+import atexit
+import itertools
+import threading
+import functools
 import json  # Import the json module
 from PIL import ImageDraw, ImageFont
 
+from capture_backends import create_backend
+
 # --- Constants and Cache File ---
 WINDOW_CACHE_FILE = 'window_cache.json'
 
+
+@functools.lru_cache(maxsize=None)
+def load_overlay_font(size):
+    """Load the overlay font once per size for the whole process."""
+    try:
+        # Try to load Arial font with slightly larger size
+        return ImageFont.truetype("arial.ttf", size=size)
+    except:
+        # Scalable default font (Pillow >= 10.1) so labels stay legible when the frame is downscaled
+        try:
+            return ImageFont.load_default(size=size)
+        except TypeError:
+            return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=8)
+def center_line_overlay(width, height):
+    """Render the center line, notches and labels for a frame size.
+
+    Returns (band, top): the RGBA strip of the overlay that has content, and the
+    y offset to paste it at. Cached, so each frame size is only drawn once.
+    """
+    layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+
+    # Calculate center coordinates
+    center_x = width // 2
+    center_y = height // 2
+
+    # Draw main yellow line from left to right edge
+    line_color = (255, 255, 0, 255)  # Yellow color
+    line_thickness = max(1, height // 100)  # Scale thickness with image height
+    draw.line([(0, center_y), (width, center_y)], fill=line_color, width=line_thickness)
+
+    # Calculate notch parameters
+    notch_length = line_thickness * 3  # Length of notch marks
+    small_notch_length = notch_length // 2  # Smaller notches for .5 increments
+    spacing = width // 40  # Double the number of segments for .5 increments
+
+    font = load_overlay_font(max(12, line_thickness * 2.5))
+
+    # Text position is now always above the line
+    text_y = center_y - notch_length - 20
+
+    # Draw notches and numbers
+    for i in range(-20, 21):  # -20 to +20 for .5 increments
+        x = center_x + (i * spacing)
+        if x >= 0 and x <= width:  # Only draw if within image bounds
+            # Determine if this is a whole number or .5 increment
+            is_whole_number = i % 2 == 0
+            current_value = i / 2 * 7.5  # Increased multiplier to make numbers larger per notch
+
+            # Draw notch (full length for whole numbers, half length for .5)
+            current_notch_length = notch_length if is_whole_number else small_notch_length
+            draw.line([(x, center_y - current_notch_length), (x, center_y + current_notch_length)],
+                      fill=line_color, width=line_thickness)
+
+            # Draw numbers at intervals of 15 (including -60, -45, -30, -15, 0, 15, 30, 45, 60)
+            if is_whole_number and int(current_value) % 15 == 0:
+                text = str(int(current_value))  # Use actual value (including negative)
+                # Calculate text width for centering
+                if hasattr(font, 'getlength'):
+                    text_width = int(font.getlength(text))
+                else:
+                    text_width = font.getsize(text)[0] if hasattr(font, 'getsize') else 6
+                text_x = x - (text_width // 2)
+
+                # Draw text in black without outline
+                draw.text((text_x, text_y), text, fill=(0, 0, 0, 255), font=font)
+
+    # Keep only the rows that have content, so compositing touches a thin strip
+    bbox = layer.getbbox() or (0, 0, width, 1)
+    top, bottom = bbox[1], bbox[3]
+    return layer.crop((0, top, width, bottom)), top
+
+class FrameWriter:
+    """Saves captured frames on a background thread.
+
+    The queue is bounded: if the disk falls behind, submit blocks rather than
+    dropping frames. File names carry a per-process sequence number so captures
+    within the same second never overwrite each other. Pending frames are
+    flushed at interpreter exit.
+    """
+
+    EXTENSIONS = {"PNG": "png", "JPEG": "jpg", "WEBP": "webp"}
+
+    def __init__(self, format="PNG", compress_level=1, quality=90, max_queue=32):
+        self.format = format.upper()
+        if self.format not in self.EXTENSIONS:
+            raise ValueError(f"Unsupported screenshot format: {format}")
+        self.compress_level = compress_level  # PNG only: 0 (fastest) to 9 (smallest)
+        self.quality = quality  # JPEG/WEBP only
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.sequence = itertools.count(1)
+        self.thread = None
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def next_filename(self, directory, title):
+        """Collision-free file name for the next frame."""
+        safe_title = ''.join(c for c in title if c.isalnum() or c in (' ', '-', '_'))
+        ext = self.EXTENSIONS[self.format]
+        return f'{directory}/{safe_title}_{int(time.time())}_{os.getpid()}-{next(self.sequence):06d}.{ext}'
+
+    def submit(self, img, filename):
+        """Queue a frame to be saved; blocks only while the queue is full."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        self.queue.put((img, filename))
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                img, filename = item
+                self.save(img, filename)
+            finally:
+                self.queue.task_done()
+
+    def save(self, img, filename):
+        try:
+            os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+            if self.format == "PNG":
+                img.save(filename, format="PNG", compress_level=self.compress_level)
+            else:
+                if img.mode not in ("RGB", "L") and self.format == "JPEG":
+                    img = img.convert("RGB")
+                img.save(filename, format=self.format, quality=self.quality)
+            print(f"Screenshot saved as {filename}")
+        except Exception as e:
+            print(f"Error saving screenshot {filename}: {e}")
+
+    def flush(self):
+        """Block until every queued frame is on disk."""
+        self.queue.join()
+
+    def close(self):
+        """Flush pending frames and stop the writer thread."""
+        with self.lock:
+            thread = self.thread
+            self.thread = None
+        if thread is not None and thread.is_alive():
+            self.queue.put(None)
+            thread.join()
+
+
+class FrameRing:
+    """Fixed-size ring of preallocated frames written by the continuous capture thread.
+
+    Slots are reused from frame to frame (reallocated only when the window size
+    changes), so steady-state capture does not allocate. Each slot carries the
+    monotonic time its capture started. Readers get a copy of a slot, never the
+    slot itself, because the writer overwrites it when the ring wraps.
+    """
+
+    def __init__(self, size=4):
+        if size < 2:
+            raise ValueError("A frame ring needs at least 2 slots")
+        self.size = size
+        self.frames = [None] * size
+        self.times = [None] * size
+        self.slot_locks = [threading.Lock() for _ in range(size)]
+        self.latest = None
+        self.condition = threading.Condition()
+
+    def write(self, fill):
+        """Fill the next slot with fill(previous image or None) and publish it.
+
+        fill returns the captured image (normally the one it was given) or None.
+        Returns the published timestamp, or None if nothing was captured.
+        """
+        index = 0 if self.latest is None else (self.latest + 1) % self.size
+        started = time.monotonic()
+        with self.slot_locks[index]:
+            # Readers still holding this slot's old timestamp will retry
+            self.times[index] = None
+            image = fill(self.frames[index])
+            if image is None:
+                return None
+            self.frames[index] = image
+            self.times[index] = started
+        with self.condition:
+            self.latest = index
+            self.condition.notify_all()
+        return started
+
+    def latest_frame(self, newer_than=None, timeout=None):
+        """(timestamp, copy of the newest frame), waiting up to timeout for one captured after newer_than.
+
+        Returns (None, None) if there is no such frame in time.
+        """
+        def ready():
+            return self.latest is not None and (newer_than is None or self.times[self.latest] > newer_than)
+
+        while True:
+            with self.condition:
+                if not self.condition.wait_for(ready, timeout):
+                    return None, None
+                index = self.latest
+                timestamp = self.times[index]
+            with self.slot_locks[index]:
+                if self.times[index] == timestamp:
+                    return timestamp, self.frames[index].copy()
+            # The writer wrapped around onto this slot meanwhile; take the newer one
+
+    def clear(self):
+        with self.condition:
+            self.latest = None
+            self.times = [None] * self.size
+
+
 class WindowCapture:
-    def __init__(self, logs_output_dir="./logs"):
+    def __init__(self, logs_output_dir="./logs", writer=None, backend=None):
         self.logs_output_dir = logs_output_dir
+        # Platform capture backend: a name from capture_backends.BACKENDS or an instance
+        self.backend = backend if hasattr(backend, "grab") else create_backend(backend)
         self.cached_window = self.load_cached_window() # Load on init
+        # (query, window) from the last successful lookup, reused across captures
+        self.resolved_window = None
+        # Screenshots are written to disk off the capture path
+        self.writer = writer or FrameWriter()
+        self.last_saved_path = None
+        # Backends are not thread-safe (one X display connection), so captures are serialized
+        self.capture_lock = threading.Lock()
+        # Optional continuous capture (see start_continuous)
+        self.ring = None
+        self.continuous_thread = None
+        self.continuous_stop = threading.Event()
 
     def load_cached_window(self):
         """Load previously selected window title from cache"""
@@ -38,167 +257,171 @@ class WindowCapture:
             return None
 
     def save_window_to_cache(self, window_title):
-        """Save selected window title to cache"""
+        """Save selected window title to cache (only written when the selection changes)"""
+        if window_title == self.cached_window:
+            return
         with open(WINDOW_CACHE_FILE, 'w') as f:
             json.dump({'window_title': window_title}, f)
+        self.cached_window = window_title
 
     def get_window_list(self):
-        """Get list of all windows (Quartz)"""
-        try:
-            window_list = CGWindowListCopyWindowInfo(kCGWindowListOptionOnScreenOnly, kCGNullWindowID)
-            windows = []
-            for window in window_list:
-                title = window.get(kCGWindowName, '')
-                owner = window.get(kCGWindowOwnerName, '')
-                if title:  # Only include windows with titles
-                    windows.append({
-                        'title': title,
-                        'owner': owner,
-                        'bounds': window.get(kCGWindowBounds, {}),
-                        'id': window.get(kCGWindowNumber, 0)
-                    })
-            return windows
-        except Exception as e:
-            print(f"Error in get_window_list: {e}")  # Error handling
-            return []
+        """Get list of all windows with a title"""
+        return self.backend.list_windows()
 
-    def cgimage_to_png(self, cgimage):
-        """Convert a CGImage to PNG data (Cocoa)"""
-        try:
-            bitmapRep = Cocoa.NSBitmapImageRep.alloc().initWithCGImage_(cgimage)
-            png_data = bitmapRep.representationUsingType_properties_(Cocoa.NSPNGFileType, None)
-            bytes_data = png_data.bytes().tobytes()
-            return bytes_data
-        except Exception as e:
-            print(f"Error in cgimage_to_png: {e}") # Error handling
-            return None
+    def get_window_info(self, window_id):
+        """Current info for one window id, or None if it is gone"""
+        return self.backend.window_info(window_id)
 
-    def draw_center_line(self, img):
-        """Draw a yellow horizontal line through the center of the image with numbered notches."""
+    def draw_center_line(self, img, in_place=False):
+        """Draw a yellow horizontal line through the center of the image with numbered notches.
+
+        The overlay is rendered once per frame size and composited in one paste.
+        """
         # Create a copy of the image to avoid modifying the original
-        img_with_line = img.copy()
-        draw = ImageDraw.Draw(img_with_line)
-        
-        # Calculate center coordinates
-        center_x = img.width // 2
-        center_y = img.height // 2
-        
-        # Draw main yellow line from left to right edge
-        line_color = (255, 255, 0)  # Yellow color
-        line_thickness = max(1, img.height // 100)  # Scale thickness with image height
-        draw.line([(0, center_y), (img.width, center_y)], fill=line_color, width=line_thickness)
-        
-        # Calculate notch parameters
-        notch_length = line_thickness * 3  # Length of notch marks
-        small_notch_length = notch_length // 2  # Smaller notches for .5 increments
-        spacing = img.width // 40  # Double the number of segments for .5 increments
-        
-        try:
-            # Try to load Arial font with slightly larger size
-            font = ImageFont.truetype("arial.ttf", size=max(12, line_thickness * 2.5))
-        except:
-            font = ImageFont.load_default()
-        
-        # Text position is now always above the line
-        text_y = center_y - notch_length - 20
-        
-        # Draw notches and numbers
-        for i in range(-20, 21):  # -20 to +20 for .5 increments
-            x = center_x + (i * spacing)
-            if x >= 0 and x <= img.width:  # Only draw if within image bounds
-                # Determine if this is a whole number or .5 increment
-                is_whole_number = i % 2 == 0
-                current_value = i / 2 * 7.5  # Increased multiplier to make numbers larger per notch
-                
-                # Draw notch (full length for whole numbers, half length for .5)
-                current_notch_length = notch_length if is_whole_number else small_notch_length
-                draw.line([(x, center_y - current_notch_length), (x, center_y + current_notch_length)], 
-                         fill=line_color, width=line_thickness)
-                
-                # Draw numbers at intervals of 15 (including -60, -45, -30, -15, 0, 15, 30, 45, 60)
-                if is_whole_number and int(current_value) % 15 == 0:
-                    text = str(int(current_value))  # Use actual value (including negative)
-                    # Calculate text width for centering
-                    text_width = font.getsize(text)[0] if hasattr(font, 'getsize') else 6
-                    text_x = x - (text_width // 2)
-                    
-                    # Draw text in black without outline
-                    draw.text((text_x, text_y), text, fill=(0, 0, 0), font=font)
-        
+        img_with_line = img if in_place else img.copy()
+        band, top = center_line_overlay(img.width, img.height)
+        img_with_line.paste(band, (0, top), band)
         return img_with_line
 
-    def capture_window(self, window_title):
-        """Capture a specific window by title (Quartz)"""
+    def resolve_window(self, window_title):
+        """Find a window by index or title by enumerating every on-screen window"""
+        windows = self.get_window_list()
+        if not windows:
+            print("No windows found!")
+            return None
+
+        window = None
+        # Try to find window by index first (if a number is provided)
         try:
-            windows = self.get_window_list()
-            if not windows:
-                print("No windows found!")
-                return None
+            idx = int(window_title)
+            if 0 <= idx < len(windows):
+                window = windows[idx]
+        except ValueError:
+            # If not a number, search by title
+            for win in windows:
+                if window_title.lower() in win['title'].lower():
+                    window = win
+                    break
 
-            window = None
-            # Try to find window by index first (if a number is provided)
-            try:
-                idx = int(window_title)
-                if 0 <= idx < len(windows):
-                    window = windows[idx]
-            except ValueError:
-                # If not a number, search by title
-                for win in windows:
-                    if window_title.lower() in win['title'].lower():
-                        window = win
-                        break
-
-            if not window:
-                print(f"No window found matching: {window_title}")
-                return None
+        if not window:
+            print(f"No window found matching: {window_title}")
+            return None
+
+        self.save_window_to_cache(window['title']) # Save to cache
+        self.resolved_window = (window_title, window)
+        return window
+
+    def cached_window_for(self, window_title):
+        """The previously resolved window if it still exists with the same bounds, else None"""
+        if self.resolved_window is None or self.resolved_window[0] != window_title:
+            return None
+        window = self.resolved_window[1]
+        current = self.get_window_info(window['id'])
+        if current is None or current['bounds'] != window['bounds']:
+            # Closed, moved or resized: enumerate again
+            self.resolved_window = None
+            return None
+        return window
 
-            self.save_window_to_cache(window['title']) # Save to cache
+    def grab_window(self, window, into=None):
+        """Capture one resolved window through the backend and add the overlay"""
+        img = self.backend.grab(window, into=into)
+        if img is None:
+            return None
+        return self.draw_center_line(img, in_place=True)  # Add the center line (img is ours)
 
-            bounds = window['bounds']
-            x, y = int(bounds['X']), int(bounds['Y'])
-            width, height = int(bounds['Width']), int(bounds['Height'])
-            rect = CGRectMake(x, y, width, height)
-            windowid = window['id']
+    def capture_window(self, window_title, into=None):
+        """Capture a specific window by title.
 
-            # --- CRITICAL: This part is most likely to cause issues ---
+        The resolved window is cached, so a capture is normally one info call plus
+        the grab; every window is only enumerated again when the capture fails or
+        the window's bounds change. If into is given and has the right size the
+        frame is captured into it.
+        """
+        with self.capture_lock:
             try:
-                windowimg = CGWindowListCreateImage(
-                    rect,
-                    kCGWindowListOptionIncludingWindow,
-                    windowid,
-                    kCGWindowImageBoundsIgnoreFraming
-                )
+                window = self.cached_window_for(window_title)
+                if window is not None:
+                    img = self.grab_window(window, into)
+                    if img is not None:
+                        return img
+                    self.resolved_window = None
+
+                window = self.resolve_window(window_title)
+                if not window:
+                    return None
+                img = self.grab_window(window, into)
+                if img is None:
+                    self.resolved_window = None
+                return img
+
             except Exception as e:
-                print(f"Error capturing window with Quartz: {e}")
+                print(f"Error in capture_window: {e}")
+                self.resolved_window = None
                 return None
-            # --------------------------------------------------------
 
-            if not windowimg:
-                print("Failed to capture window")
-                return None
+    def start_continuous(self, window_title, fps=10, ring_size=4):
+        """Capture the window continuously at up to fps into a preallocated ring buffer.
 
-            png_data = self.cgimage_to_png(windowimg)
-            if not png_data:
-                print("Failed to convert image to PNG")
-                return None
+        Frames are then read with latest_frame, so a caller that just acted can
+        take a frame captured after the action instead of waiting for a capture.
+        """
+        self.stop_continuous()
+        self.ring = FrameRing(ring_size)
+        self.continuous_stop.clear()
+        self.continuous_thread = threading.Thread(target=self._continuous_loop, args=(window_title, fps),
+                                                  daemon=True)
+        self.continuous_thread.start()
 
-            img = Image.open(io.BytesIO(png_data))
-            img = self.draw_center_line(img)  # Add the center line
-            return img
+    def _continuous_loop(self, window_title, fps):
+        interval = 1.0 / fps
+        while not self.continuous_stop.is_set():
+            started = time.monotonic()
+            if self.ring.write(lambda slot: self.capture_window(window_title, into=slot)) is None:
+                # Window missing or capture failing: back off instead of spinning
+                self.continuous_stop.wait(1.0)
+                continue
+            self.continuous_stop.wait(max(0.0, interval - (time.monotonic() - started)))
 
-        except Exception as e:
-            print(f"Error in capture_window: {e}")
-            return None
+    def stop_continuous(self):
+        """Stop the continuous capture thread, if running."""
+        thread = self.continuous_thread
+        if thread is not None:
+            self.continuous_stop.set()
+            thread.join()
+            self.continuous_thread = None
+
+    @property
+    def continuous(self):
+        return self.continuous_thread is not None and self.continuous_thread.is_alive()
+
+    def latest_frame(self, newer_than=None, timeout=None):
+        """(timestamp, image) of the newest continuous frame captured after newer_than.
+
+        Timestamps are time.monotonic() values taken when the capture started.
+        Waits up to timeout seconds; returns (None, None) if continuous capture is
+        off or no such frame arrives. The image is the caller's own copy.
+        """
+        if self.ring is None:
+            return None, None
+        return self.ring.latest_frame(newer_than, timeout)
+
+    def save_frame(self, img, window_title):
+        """Queue a captured frame to be saved in the background.
+
+        The file name is also recorded in img.info["saved_path"], so views can
+        drop the frame and reload it from the logs directory later.
+        """
+        filename = self.writer.next_filename(self.logs_output_dir, window_title)
+        img.info["saved_path"] = filename
+        self.writer.submit(img, filename)
+        self.last_saved_path = filename
 
     def capture_and_save(self, window_title):
-        """Captures, saves, and returns the image."""
+        """Captures and returns the image; it is saved in the background."""
         img = self.capture_window(window_title)
         if img:
-            os.makedirs(self.logs_output_dir, exist_ok=True)
-            safe_title = ''.join(c for c in window_title if c.isalnum() or c in (' ', '-', '_'))
-            filename = f'{self.logs_output_dir}/{safe_title}_{int(time.time())}.png'
-            img.save(filename)
-            print(f"Screenshot saved as {filename}")
+            self.save_frame(img, window_title)
             return img
         else:
             return None
\ No newline at end of file
@@ -0,0 +1,204 @@
+import json
+import math
+
+# --- Import move.py ---
+import MCPI_Scripts.move as move
+# --- Import door module ---
+from MCPI_Scripts.door import check_for_door
+
+
+def _tool(name, description, properties=None, required=None):
+    """Build an OpenAI-style function tool definition (see openai_function_calling.txt)."""
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties or {},
+                "required": required or [],
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def _degrees(description):
+    return {"degrees": {"type": "number", "minimum": 0, "maximum": 360, "description": description}}
+
+
+# Actions from move.py and door.py exposed to the model
+TOOL_DEFINITIONS = [
+    _tool("move_forward", "Move the player forward (negative to move back) by a number of blocks.",
+          {"distance": {"type": "number", "minimum": -50, "maximum": 50, "description": "Blocks to move"}},
+          ["distance"]),
+    _tool("look_left", "Rotate the view to the left.", _degrees("Degrees to turn left"), ["degrees"]),
+    _tool("look_right", "Rotate the view to the right.", _degrees("Degrees to turn right"), ["degrees"]),
+    _tool("look_up", "Tilt the view upwards.", _degrees("Degrees to tilt up"), ["degrees"]),
+    _tool("look_down", "Tilt the view downwards.", _degrees("Degrees to tilt down"), ["degrees"]),
+    _tool("center_view", "Reset yaw and pitch to 0."),
+    _tool("open_door", "Open or close the door the player is looking at (within 5 blocks)."),
+    _tool("post_to_chat", "Post a message to the Minecraft chat.",
+          {"msg": {"type": "string", "description": "Message text"}}, ["msg"]),
+]
+
+# Python implementation behind each tool name
+TOOL_FUNCTIONS = {
+    "move_forward": move.move_forward,
+    "look_left": move.look_left,
+    "look_right": move.look_right,
+    "look_up": move.look_up,
+    "look_down": move.look_down,
+    "center_view": move.center_view,
+    "open_door": check_for_door,
+    "post_to_chat": move.post_to_chat,
+}
+
+# Plugin command behind each tool, with tool argument -> plugin parameter names,
+# for sending several calls as one batch frame (see move.send_batch)
+PLUGIN_COMMANDS = {
+    "move_forward": ("move_forward", {"distance": "distance"}),
+    "look_left": ("look_left", {"degrees": "degrees"}),
+    "look_right": ("look_right", {"degrees": "degrees"}),
+    "look_up": ("look_up", {"degrees": "degrees"}),
+    "look_down": ("look_down", {"degrees": "degrees"}),
+    "center_view": ("center_view", {}),
+    "open_door": ("interact", {}),
+    "post_to_chat": ("chat", {"msg": "message"}),
+}
+
+JSON_TYPES = {
+    "number": (int, float),
+    "integer": (int,),
+    "string": (str,),
+    "boolean": (bool,),
+}
+
+
+class ToolError(Exception):
+    """Raised when a tool call names an unknown tool or has invalid arguments."""
+
+
+class ToolRegistry:
+    """Dispatches tool calls to their functions, validating arguments against the definitions."""
+
+    def __init__(self, definitions=TOOL_DEFINITIONS, functions=TOOL_FUNCTIONS):
+        self.definitions = definitions
+        self.schemas = {}
+        self.functions = {}
+        for definition in definitions:
+            name = definition["function"]["name"]
+            self.schemas[name] = definition["function"]["parameters"]
+            self.functions[name] = functions[name]
+
+    def validate(self, name, arguments):
+        """Return the checked keyword arguments for a call, raising ToolError if they are invalid."""
+        if name not in self.schemas:
+            raise ToolError(f"Unknown tool: {name}")
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            except ValueError as e:
+                raise ToolError(f"{name}: arguments are not valid JSON: {e}")
+        if not isinstance(arguments, dict):
+            raise ToolError(f"{name}: arguments must be an object")
+
+        schema = self.schemas[name]
+        properties = schema["properties"]
+        for key in schema["required"]:
+            if key not in arguments:
+                raise ToolError(f"{name}: missing argument '{key}'")
+        for key, value in arguments.items():
+            if key not in properties:
+                raise ToolError(f"{name}: unexpected argument '{key}'")
+            spec = properties[key]
+            # bool is a subclass of int, so reject it explicitly for numbers
+            if not isinstance(value, JSON_TYPES[spec["type"]]) or (
+                    spec["type"] in ("number", "integer") and isinstance(value, bool)):
+                raise ToolError(f"{name}: '{key}' must be a {spec['type']}")
+            # NaN passes every range check (all its comparisons are false) and is not valid JSON
+            if spec["type"] in ("number", "integer") and not math.isfinite(value):
+                raise ToolError(f"{name}: '{key}' must be a finite number")
+            if "minimum" in spec and value < spec["minimum"]:
+                raise ToolError(f"{name}: '{key}' must be >= {spec['minimum']}")
+            if "maximum" in spec and value > spec["maximum"]:
+                raise ToolError(f"{name}: '{key}' must be <= {spec['maximum']}")
+        return arguments
+
+    def dispatch(self, name, arguments):
+        """Validate and run one tool call. Returns a result dict suitable for a tool message."""
+        try:
+            kwargs = self.validate(name, arguments)
+        except ToolError as e:
+            return {"ok": False, "error": str(e)}
+        try:
+            reply = self.functions[name](**kwargs)
+        except Exception as e:
+            return {"ok": False, "error": f"{name} failed: {e}"}
+        if isinstance(reply, dict):
+            # Acknowledgement from the plugin, with the resulting pose
+            return {"ok": reply.get("status") == "ok", "error": reply.get("error"), "pose": reply.get("pose")}
+        if reply is None:
+            return {"ok": False, "error": f"{name}: no acknowledgement from the server"}
+        return {"ok": bool(reply)}
+
+    def parse_text_command(self, command):
+        """Parse a free-text call such as "look_left(30)" into (name, arguments).
+
+        Positional arguments map onto the tool's parameters in definition order.
+        """
+        name, paren, rest = command.partition("(")
+        name = name.strip()
+        if not paren or not rest.rstrip().endswith(")"):
+            raise ToolError(f"Malformed command: {command}")
+        if name not in self.schemas:
+            raise ToolError(f"Unknown tool: {name}")
+        raw = rest.rstrip()[:-1].strip()
+        params = list(self.schemas[name]["properties"].items())
+        if len(params) == 1 and params[0][1]["type"] == "string":
+            # A lone string argument may itself contain commas
+            values = [raw] if raw else []
+        else:
+            values = [value.strip() for value in raw.split(",")] if raw else []
+        if len(values) > len(params):
+            raise ToolError(f"{name}: too many arguments")
+        arguments = {}
+        for (key, spec), value in zip(params, values):
+            if spec["type"] == "string":
+                arguments[key] = value.strip("\"'")
+            else:
+                try:
+                    number = float(value)
+                except ValueError:
+                    raise ToolError(f"{name}: '{key}' must be a {spec['type']}")
+                if not math.isfinite(number):
+                    raise ToolError(f"{name}: '{key}' must be a finite number")
+                arguments[key] = int(number) if number.is_integer() else number
+        return name, arguments
+
+    def parse_sequence(self, text):
+        """Parse calls separated by ";" or newlines, e.g. "look_left(30); move_forward(2)".
+
+        Returns validated (name, arguments) pairs, raising ToolError on the first bad call.
+        """
+        calls = []
+        for part in text.replace("\n", ";").split(";"):
+            part = part.strip()
+            if part:
+                name, arguments = self.parse_text_command(part)
+                calls.append((name, self.validate(name, arguments)))
+        return calls
+
+
+def plugin_actions(calls):
+    """(command, params) pairs for move.send_batch from (tool name, arguments) calls."""
+    actions = []
+    for name, arguments in calls:
+        command, param_names = PLUGIN_COMMANDS[name]
+        actions.append((command, {param_names[key]: value for key, value in arguments.items()}))
+    return actions
+
+
+# Shared registry used by the agent engine
+default_registry = ToolRegistry()
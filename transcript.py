@@ -0,0 +1,166 @@
+import os
+import tkinter as tk
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+
+class Transcript:
+    """Bounded chat transcript on top of a Text widget.
+
+    - Inserts are queued and flushed together every batch_ms, so a burst of
+      streamed tokens or autonomous turns costs one widget update.
+    - Only the max_live most recent (or most recently viewed) thumbnails keep a
+      PhotoImage. Older ones are swapped for a blank placeholder of the same size
+      and reloaded from their saved screenshot when scrolled back into view.
+    - Beyond max_lines the oldest lines are deleted.
+    """
+
+    def __init__(self, text, preview_service, max_live=20, max_lines=5000, batch_ms=50,
+                 thumbnail_name="history"):
+        self.text = text
+        self.preview_service = preview_service
+        self.max_live = max_live
+        self.max_lines = max_lines
+        self.batch_ms = batch_ms
+        self.thumbnail_name = thumbnail_name
+        self.pending = []  # ("text", text, tag) or ("image", PIL image, path)
+        self.flush_scheduled = False
+        self.entries = {}  # image name -> {"path", "size", "photo"}
+        self.live = OrderedDict()  # image names with a loaded PhotoImage, least recently shown first
+        self.loading = set()
+        self.placeholders = {}  # size -> shared blank PhotoImage
+        self.check_scheduled = False
+        # Watch scrolling to reload thumbnails as they come into view
+        self.scrollbar_set = getattr(text, "vbar", None) and text.vbar.set
+        text.configure(yscrollcommand=self.on_scroll)
+
+    def add(self, content, tag=None):
+        """Queue text for the end of the transcript."""
+        self.pending.append(("text", content, tag))
+        self.schedule_flush()
+
+    def add_image(self, image, path=None):
+        """Queue a thumbnail of a frame; path is where the full frame was saved, for reloading."""
+        if path is None:
+            path = image.info.get("saved_path")
+        self.pending.append(("image", image, path))
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.text.after(self.batch_ms, self.flush)
+
+    def flush(self):
+        """Insert everything queued in one widget update."""
+        self.flush_scheduled = False
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        self.text.config(state='normal')
+        for kind, value, extra in pending:
+            if kind == "text":
+                if extra:
+                    self.text.insert(tk.END, value, extra)
+                else:
+                    self.text.insert(tk.END, value)
+            else:
+                thumbnail = self.preview_service.preview(value, self.thumbnail_name)
+                photo = ImageTk.PhotoImage(thumbnail)
+                name = self.text.image_create(tk.END, image=photo)
+                self.entries[name] = {"path": extra, "size": thumbnail.size, "photo": photo}
+                self.live[name] = True
+        self.trim_lines()
+        self.evict()
+        self.text.config(state='disabled')
+        self.text.see(tk.END)
+
+    def trim_lines(self):
+        lines = int(self.text.index('end-1c').split('.')[0])
+        if lines <= self.max_lines:
+            return
+        self.text.delete('1.0', f'{lines - self.max_lines + 1}.0')
+        # Forget thumbnails that went with the deleted lines
+        existing = set(self.text.image_names())
+        for name in [name for name in self.entries if name not in existing]:
+            del self.entries[name]
+            self.live.pop(name, None)
+
+    def placeholder(self, size):
+        if size not in self.placeholders:
+            self.placeholders[size] = tk.PhotoImage(width=size[0], height=size[1])
+        return self.placeholders[size]
+
+    def visible_images(self):
+        """Names of the thumbnails currently scrolled into view."""
+        first = self.text.index("@0,0")
+        last = self.text.index(f"@0,{self.text.winfo_height()}")
+        return {name for name in self.entries
+                if self.text.compare(name, ">=", f"{first} linestart")
+                and self.text.compare(name, "<=", f"{last} lineend")}
+
+    def evict(self, keep=()):
+        """Swap the least recently shown thumbnails beyond max_live for placeholders."""
+        for name in list(self.live):
+            if len(self.live) <= self.max_live:
+                break
+            if name in keep:
+                continue
+            entry = self.entries[name]
+            entry["photo"] = None
+            self.text.image_configure(name, image=self.placeholder(entry["size"]))
+            del self.live[name]
+
+    def on_scroll(self, first, last):
+        if self.scrollbar_set:
+            self.scrollbar_set(first, last)
+        if not self.check_scheduled:
+            self.check_scheduled = True
+            self.text.after(self.batch_ms, self.reload_visible)
+
+    def reload_visible(self):
+        """Reload evicted thumbnails that are now on screen, off the Tk thread."""
+        self.check_scheduled = False
+        visible = self.visible_images()
+        for name in visible:
+            if name in self.live:
+                self.live.move_to_end(name)
+                continue
+            entry = self.entries[name]
+            if name in self.loading or not entry["path"]:
+                continue
+            self.loading.add(name)
+            self.preview_service.pool.submit(self.load_thumbnail, name, entry["path"], entry["size"])
+
+    def load_thumbnail(self, name, path, size):
+        try:
+            with Image.open(path) as image:
+                # Screenshots are large; let the decoder downscale where it can
+                image.draft("RGB", (size[0] * 2, size[1] * 2))
+                thumbnail = image.convert("RGB").resize(size, Image.Resampling.LANCZOS)
+        except (OSError, ValueError) as e:
+            if not os.path.exists(path):
+                print(f"Screenshot {path} is no longer in the logs directory")
+            else:
+                print(f"Could not reload screenshot {path}: {e}")
+            thumbnail = None
+        self.text.after(0, lambda: self.show_thumbnail(name, thumbnail))
+
+    def show_thumbnail(self, name, thumbnail):
+        self.loading.discard(name)
+        entry = self.entries.get(name)
+        if entry is None or thumbnail is None:
+            return
+        entry["photo"] = ImageTk.PhotoImage(thumbnail)
+        self.text.image_configure(name, image=entry["photo"])
+        self.live[name] = True
+        self.evict(keep=self.visible_images())
+
+    def clear(self):
+        self.pending = []
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.config(state='disabled')
+        self.entries.clear()
+        self.live.clear()